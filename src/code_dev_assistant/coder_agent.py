@@ -84,19 +84,18 @@ class CoderAgent:
     async def initialize_project_context(self, project_path: str = ".") -> AgentResponse:
         """Initialize project context by analyzing the codebase."""
         try:
-            # Index codebase for RAG
-            await self.rag_system.execute_rag_tool("index_codebase", {
-                "directory": project_path,
-                "force_reindex": False
-            })
-            
-            # Analyze project structure
-            project_info = await self.code_analyzer.execute_analysis_tool("extract_code_chunks", {
-                "directory": project_path
-            })
-            
-            # Get Git status
-            git_status = await self.git_tools.execute_git_tool("git_status", {})
+            # Index codebase for RAG, analyze project structure and get Git
+            # status; the three are independent, so run them together
+            _, project_info, git_status = await asyncio.gather(
+                self.rag_system.execute_rag_tool("index_codebase", {
+                    "directory": project_path,
+                    "force_reindex": False
+                }),
+                self.code_analyzer.execute_analysis_tool("extract_code_chunks", {
+                    "directory": project_path
+                }),
+                self.git_tools.execute_git_tool("git_status", {})
+            )
             
             self.current_project_context = {
                 "project_path": project_path,
@@ -232,7 +231,8 @@ Please respond with a JSON object containing:
         
         try:
             response = await self.llm_client._call_ollama(analysis_prompt, 
-                "You are an expert at analyzing software development requests and determining appropriate actions.")
+                "You are an expert at analyzing software development requests and determining appropriate actions.",
+                stream=False)
             
             # Try to parse JSON response
             import re
@@ -1,6 +1,8 @@
 """
 Configuration management for the code development assistant.
 """
+import copy
+import functools
 import os
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -25,6 +27,10 @@ class RAGConfig:
     embedding_model: str = "all-MiniLM-L6-v2"
     max_chunk_size: int = 2000
     similarity_threshold: float = 0.7
+    # Approximate query cache: a search whose embedding is at least this
+    # cosine-similar to a cached one (same limit/filters) reuses its results
+    semantic_cache_size: int = 256
+    semantic_cache_threshold: float = 0.9
     excluded_dirs: Optional[list] = None
     included_extensions: Optional[list] = None
     
@@ -245,8 +251,9 @@ class AssistantConfig:
         return config
 
 
-def get_config() -> AssistantConfig:
-    """Get configuration from various sources in order of precedence."""
+@functools.lru_cache(maxsize=1)
+def _load_config() -> AssistantConfig:
+    """Load configuration from various sources in order of precedence."""
     # 1. Check for config file in current directory
     if os.path.exists('.code-assistant.json'):
         return AssistantConfig.from_file('.code-assistant.json')
@@ -260,6 +267,19 @@ def get_config() -> AssistantConfig:
     return AssistantConfig.from_env()
 
 
+def get_config() -> AssistantConfig:
+    """Get configuration from various sources in order of precedence.
+    
+    The sources are read once per process; each call returns its own copy,
+    so callers may modify it freely. Call ``get_config.cache_clear()`` to
+    re-read the config file and environment.
+    """
+    return copy.deepcopy(_load_config())
+
+
+get_config.cache_clear = _load_config.cache_clear
+
+
 def create_sample_config(path: str = '.code-assistant.json'):
     """Create a sample configuration file."""
     config = AssistantConfig.default()
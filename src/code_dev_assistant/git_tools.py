@@ -265,14 +265,11 @@ class GitTools:
         """Get Git repository status."""
         try:
             repo = self.repo
-            status_info = {
-                "branch": repo.active_branch.name,
-                "ahead": repo.iter_commits('origin/HEAD..HEAD') if repo.remotes else 0,
-                "behind": repo.iter_commits('HEAD..origin/HEAD') if repo.remotes else 0,
-                "staged": list(repo.index.diff("HEAD")),
-                "unstaged": list(repo.index.diff(None)),
-                "untracked": repo.untracked_files
-            }
+            # One `git status` process reports the branch and every staged,
+            # unstaged and untracked path (index.diff and untracked_files
+            # would each spawn their own git command)
+            output = repo.git.status("--porcelain=v1", "--branch", "-z", "--untracked-files=all")
+            status_info = self._parse_porcelain_status(output)
             
             result = f"Current branch: {status_info['branch']}\n"
             result += f"Staged files: {len(status_info['staged'])}\n"
@@ -281,13 +278,13 @@ class GitTools:
             
             if status_info['staged']:
                 result += "\nStaged changes:\n"
-                for item in status_info['staged']:
-                    result += f"  {item.change_type}: {item.a_path}\n"
+                for change_type, path in status_info['staged']:
+                    result += f"  {change_type}: {path}\n"
             
             if status_info['unstaged']:
                 result += "\nUnstaged changes:\n"
-                for item in status_info['unstaged']:
-                    result += f"  {item.change_type}: {item.a_path}\n"
+                for change_type, path in status_info['unstaged']:
+                    result += f"  {change_type}: {path}\n"
             
             if status_info['untracked']:
                 result += "\nUntracked files:\n"
@@ -298,6 +295,36 @@ class GitTools:
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error getting status: {str(e)}")]
 
+    @staticmethod
+    def _parse_porcelain_status(output: str) -> Dict[str, Any]:
+        """Parse `git status --porcelain=v1 --branch -z` output."""
+        status_info = {"branch": None, "staged": [], "unstaged": [], "untracked": []}
+        fields = output.split("\0")
+        i = 0
+        while i < len(fields):
+            entry = fields[i]
+            i += 1
+            if not entry:
+                continue
+            if entry.startswith("## "):
+                # e.g. "main...origin/main [ahead 1]", "No commits yet on main"
+                header = entry[3:]
+                if header.startswith("No commits yet on "):
+                    header = header[len("No commits yet on "):]
+                status_info["branch"] = header.split("...", 1)[0].split(" [", 1)[0]
+                continue
+            code, path = entry[:2], entry[3:]
+            if code == "??":
+                status_info["untracked"].append(path)
+                continue
+            if code[0] in "RC":
+                i += 1  # -z puts the rename/copy source in the next field
+            if code[0] != " ":
+                status_info["staged"].append((code[0], path))
+            if code[1] != " ":
+                status_info["unstaged"].append((code[1], path))
+        return status_info
+
     async def _git_add(self, files: List[str]) -> List[types.TextContent]:
         """Add files to staging area."""
         try:
@@ -2,12 +2,69 @@
 LLM integration for code generation and understanding using Ollama.
 """
 import asyncio
+import contextvars
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 import json
+from importlib.util import find_spec
 import mcp.types as types
 
 
+# Queue that receives response chunks while a stream_llm_tool call is active
+_stream_queue: contextvars.ContextVar[Optional[asyncio.Queue]] = contextvars.ContextVar(
+    "llm_stream_queue", default=None
+)
+
+# One pooled client serves every Ollama call; HTTP/2 is used when h2 is installed
+OLLAMA_POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+class LLMStream:
+    """Run a coroutine with its Ollama calls streamed.
+    
+    Iterating yields response text chunks as they arrive from every
+    ``_call_ollama`` made by the coroutine (unless called with ``stream=False``);
+    once iteration ends, ``result`` holds the coroutine's return value.
+    """
+    
+    def __init__(self, coro):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        token = _stream_queue.set(self._queue)
+        try:
+            self._task = asyncio.ensure_future(coro)
+        finally:
+            _stream_queue.reset(token)
+        self.result = None
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> str:
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if self._task.done():
+            self.result = self._task.result()
+            raise StopAsyncIteration
+        
+        getter = asyncio.ensure_future(self._queue.get())
+        try:
+            await asyncio.wait({getter, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            getter.cancel()
+            self.cancel()
+            raise
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+        return await self.__anext__()
+    
+    def cancel(self):
+        """Cancel the underlying coroutine if it is still running."""
+        if not self._task.done():
+            self._task.cancel()
+
+
 class CodeLLM:
     """LLM integration for code-related tasks using Ollama."""
     
@@ -15,7 +72,17 @@ class CodeLLM:
         """Initialize LLM client."""
         self.base_url = base_url
         self.model = model
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = self._new_client()
+    
+    @staticmethod
+    def _new_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=60.0, limits=OLLAMA_POOL_LIMITS, http2=HTTP2_AVAILABLE)
+    
+    async def start_session(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, reopening it if it has been closed."""
+        if self.client.is_closed:
+            self.client = self._new_client()
+        return self.client
     
     def get_llm_tools(self) -> List[types.Tool]:
         """Return list of LLM-related MCP tools."""
@@ -273,29 +340,68 @@ class CodeLLM:
         except Exception as e:
             return [types.TextContent(type="text", text=f"LLM operation failed: {str(e)}")]
     
-    async def _call_ollama(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Call Ollama API."""
+    async def stream_llm_tool(self, name: str, arguments: Dict[str, Any]) -> AsyncIterator[str]:
+        """Execute an LLM tool, yielding the response text in chunks as Ollama produces it."""
+        stream = LLMStream(self.execute_llm_tool(name, arguments))
+        streamed = []
+        try:
+            async for chunk in stream:
+                streamed.append(chunk)
+                yield chunk
+            
+            # Errors (and anything not streamed) only exist in the tool result
+            text = stream.result[0].text if stream.result else ""
+            sent = "".join(streamed)
+            if text != sent:
+                yield text[len(sent):] if text.startswith(sent) else f"\n{text}"
+        finally:
+            stream.cancel()
+    
+    async def _call_ollama(self, prompt: str, system_prompt: Optional[str] = None, stream: bool = True) -> str:
+        """Call Ollama API.
+        
+        Inside an ``LLMStream`` the response is streamed to it, unless ``stream``
+        is False (for internal calls whose raw output should not be shown).
+        """
         try:
             # Combine system prompt and user prompt for the generate endpoint
             full_prompt = prompt
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
             
+            client = await self.start_session()
+            queue = _stream_queue.get() if stream else None
             payload = {
                 "model": self.model,
                 "prompt": full_prompt,
-                "stream": False
+                "stream": queue is not None
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                return result.get("response", "")
+            if queue is not None:
+                parts = []
+                async with client.stream("POST", f"{self.base_url}/api/generate", json=payload, timeout=30.0) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        text = chunk.get("response", "")
+                        if text:
+                            parts.append(text)
+                            queue.put_nowait(text)
+                        if chunk.get("done"):
+                            break
+                return "".join(parts)
+            
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            return result.get("response", "")
             
         except httpx.ConnectError:
             raise RuntimeError(f"Cannot connect to Ollama at {self.base_url}. Make sure Ollama is running.")
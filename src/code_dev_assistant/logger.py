@@ -226,8 +226,14 @@ class DebugLogger:
         """Get the current context without removing it."""
         return self.context_stack[-1] if self.context_stack else None
     
+    def isEnabledFor(self, level: int) -> bool:
+        """Check whether a message at ``level`` would be emitted."""
+        return self.logger.isEnabledFor(level)
+    
     def _log_with_context(self, level: int, msg: str, *args, **kwargs):
         """Log message with current context."""
+        if not self.logger.isEnabledFor(level):
+            return
         extra = kwargs.get('extra', {})
         
         # Add current context if available
@@ -343,9 +349,21 @@ class LogContextManager:
         self.logger.pop_context()
 
 
+# Entry/exit tracing by log_function_calls is opt-in: it formats a record
+# (with the call's arguments) twice per call, which dominates cheap handlers.
+LOG_TRACE = os.environ.get("GENTIFY_TRACE") == "1"
+
+
 def log_function_calls(logger: DebugLogger = None):
-    """Decorator to automatically log function calls."""
+    """Decorator to automatically log function calls.
+    
+    Only active when GENTIFY_TRACE=1 at import time; otherwise the function
+    is returned undecorated.
+    """
     def decorator(func: Callable):
+        if not LOG_TRACE:
+            return func
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             func_logger = logger or get_logger(func.__module__)
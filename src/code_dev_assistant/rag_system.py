@@ -4,32 +4,30 @@ Uses LanceDB for vector storage and sentence-transformers for embeddings.
 """
 import os
 import asyncio
+import concurrent.futures
+import functools
 import hashlib
+import importlib.util
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, asdict
 import json
 
-# Check for optional dependencies
+# Check for optional dependencies. sentence-transformers (and torch behind it)
+# is only located here; it is imported when a local embedding model is loaded,
+# and isn't needed at all with the Infinity embedding backend.
+LOCAL_EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
 DEPENDENCIES_AVAILABLE = True
 try:
     import lancedb
     import pandas as pd
-    from sentence_transformers import SentenceTransformer
 except ImportError:
     DEPENDENCIES_AVAILABLE = False
     # Create stubs for type checking
     if TYPE_CHECKING:
         import lancedb
         import pandas as pd
-        from sentence_transformers import SentenceTransformer
     else:
-        class SentenceTransformer:
-            def __init__(self, *args, **kwargs): 
-                pass
-            def encode(self, *args, **kwargs): 
-                return []
-        
         class LanceDBStub:
             @staticmethod
             def connect(*args, **kwargs): 
@@ -52,6 +50,7 @@ except ImportError:
         lancedb = LanceDBStub()
         pd = PandasStub()
 
+import httpx
 import mcp.types as types
 
 from .code_analyzer import CodeAnalyzer, CodeChunk
@@ -73,17 +72,97 @@ class CodeDocument:
     metadata: Optional[str] = None  # JSON string
 
 
+class InfinityEmbedder:
+    """Embedding client for an Infinity (OpenAI-compatible) embedding server.
+    
+    Mirrors the subset of ``SentenceTransformer.encode`` used by ``CodeRAG``,
+    as a coroutine so requests don't block the event loop; the server batches
+    concurrent requests from all clients on its side.
+    """
+    
+    def __init__(self, url: str, model_name: str, timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        self.model_name = model_name
+        self.client = httpx.AsyncClient(timeout=timeout)
+    
+    async def encode(self, sentences, batch_size: int = 32, **kwargs):
+        """Embed a string or a list of strings."""
+        single = isinstance(sentences, str)
+        inputs = [sentences] if single else list(sentences)
+        
+        embeddings = []
+        for start in range(0, len(inputs), batch_size):
+            response = await self.client.post(
+                f"{self.url}/embeddings",
+                json={"input": inputs[start:start + batch_size], "model": self.model_name}
+            )
+            response.raise_for_status()
+            data = sorted(response.json()["data"], key=lambda item: item["index"])
+            embeddings.extend(item["embedding"] for item in data)
+        
+        return embeddings[0] if single else embeddings
+    
+    async def aclose(self):
+        """Close the HTTP connection pool."""
+        await self.client.aclose()
+
+
+@functools.lru_cache(maxsize=2)
+def load_sentence_transformer(model_name: str):
+    """Load a local embedding model once per process.
+
+    CodeRAG instances for different workspaces share the loaded model, so
+    switching codebases doesn't deserialize the weights again.
+    """
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+# LanceDB queries and the pandas work on their results are blocking. They run
+# on their own small pool rather than on the caller's event loop or the default
+# executor that embedding uses, so a slow scan does not hold up either.
+TABLE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-table")
+
+
 class CodeRAG:
     """RAG system for code understanding and retrieval."""
     
-    def __init__(self, db_path: str = "./databases/rag/default", model_name: str = "all-MiniLM-L6-v2"):
-        """Initialize RAG system with LanceDB and sentence transformer."""
+    def __init__(self, db_path: str = "./databases/rag/default", model_name: str = "all-MiniLM-L6-v2",
+                 semantic_cache_size: int = 0, semantic_cache_threshold: float = 0.9,
+                 embedding_backend: str = "local", infinity_url: str = "http://localhost:7997"):
+        """Initialize RAG system with LanceDB and sentence transformer.
+
+        ``embedding_backend="infinity"`` sends embedding requests to the
+        Infinity server at ``infinity_url`` instead of loading the model
+        in-process; the server must serve ``model_name``.
+        
+        A non-zero ``semantic_cache_size`` enables an approximate query cache:
+        searches whose embedding is within ``semantic_cache_threshold`` cosine
+        similarity of a cached query (with identical filters) reuse its result,
+        for calls to ``search_code_hits`` that pass ``approximate=True``.
+        """
         self.db_path = db_path
         self.model_name = model_name
+        self.embedding_backend = embedding_backend
+        self.infinity_url = infinity_url
         self.embedding_model = None
         self.db = None
         self.table = None
         self.code_analyzer = CodeAnalyzer()
+        self.semantic_cache = None
+        if semantic_cache_size > 0:
+            try:
+                from .semantic_cache import SemanticCache
+                self.semantic_cache = SemanticCache(semantic_cache_size, semantic_cache_threshold)
+            except ImportError:
+                pass  # numpy unavailable; search without the approximate cache
+        # Query embedding batches: queries arriving while an encode is running
+        # on ``_embed_loop`` wait in ``_embed_pending`` for the next batch
+        self._embed_pending: List[Tuple[str, asyncio.Future]] = []
+        self._embed_busy = False
+        self._embed_loop = None
+        # Running flush tasks; the loop only keeps weak references to tasks
+        self._embed_tasks = set()
         self._initialized = False
     
     async def initialize(self):
@@ -91,12 +170,15 @@ class CodeRAG:
         if self._initialized:
             return
         
-        if not DEPENDENCIES_AVAILABLE:
+        if not DEPENDENCIES_AVAILABLE or (self.embedding_backend == "local" and not LOCAL_EMBEDDINGS_AVAILABLE):
             raise RuntimeError("RAG system dependencies not available. Please install: pip install lancedb pandas sentence-transformers")
         
         try:
             # Initialize embedding model
-            self.embedding_model = SentenceTransformer(self.model_name)
+            if self.embedding_backend == "infinity":
+                self.embedding_model = InfinityEmbedder(self.infinity_url, self.model_name)
+            else:
+                self.embedding_model = load_sentence_transformer(self.model_name)
             
             # Initialize LanceDB
             self.db = lancedb.connect(self.db_path)
@@ -107,7 +189,7 @@ class CodeRAG:
             except Exception:
                 # Create new table with schema
                 # First, get the actual embedding dimension from the model
-                test_embedding = self.embedding_model.encode(["test"])
+                test_embedding = await self._encode(["test"])
                 embedding_dim = len(test_embedding[0])
                 
                 sample_data = [{
@@ -407,6 +489,9 @@ class CodeRAG:
             if deleted_files:
                 result += f"Removed {len(deleted_files)} deleted files"
             
+            if self.semantic_cache is not None:
+                self.semantic_cache.clear()
+            
             return [types.TextContent(type="text", text=result)]
             
         except Exception as e:
@@ -439,7 +524,7 @@ class CodeRAG:
                     embedding_text = f"{embedding_text}\n{chunk.docstring}"
                 
                 # Generate embedding - handle both numpy and list return types
-                embedding_result = self.embedding_model.encode(embedding_text)
+                embedding_result = await self._encode(embedding_text)
                 if hasattr(embedding_result, 'tolist'):
                     embedding = embedding_result.tolist()
                 else:
@@ -497,73 +582,220 @@ class CodeRAG:
     async def _search_code(self, query: str, limit: int, similarity_threshold: float,
                           filter_language: Optional[str], filter_type: Optional[str]) -> List[types.TextContent]:
         """Search for code using semantic similarity."""
+        response_text, _ = await self.search_code_hits(
+            query, limit, similarity_threshold, filter_language, filter_type
+        )
+        return [types.TextContent(type="text", text=response_text)]
+    
+    async def search_code_hits(self, query: str, limit: int = 5, similarity_threshold: float = 0.7,
+                               filter_language: Optional[str] = None,
+                               filter_type: Optional[str] = None,
+                               query_vector: Optional[List[float]] = None,
+                               approximate: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Search for code and return the rendered text together with structured hits.
+        
+        Each hit is a dict with ``code``, ``file_path``, ``name``, ``language``,
+        ``chunk_type`` and ``similarity``. The hit list is empty whenever the
+        text is a "no results" or error message. Pass ``query_vector`` (e.g. from
+        ``encode_queries``) to skip embedding the query again.
+        
+        With ``approximate=True`` the result of an earlier, near-identical query
+        may be returned from the semantic cache, including that query's
+        similarity scores; leave it off for explicit searches.
+        """
+        await self.initialize()
         if not DEPENDENCIES_AVAILABLE or not self._initialized or self.table is None or self.embedding_model is None:
-            return [types.TextContent(type="text", text="RAG system not properly initialized")]
+            return "RAG system not properly initialized", []
             
         try:
-            # Generate query embedding - handle both numpy and list return types
-            embedding_result = self.embedding_model.encode(query)
-            if hasattr(embedding_result, 'tolist'):
-                query_embedding = embedding_result.tolist()
+            if query_vector is not None:
+                query_embedding = [float(x) for x in query_vector]
             else:
-                query_embedding = [float(x) for x in embedding_result]  # Ensure float type
+                query_embedding = await self._embed_query(query)
             
-            # Build search - specify the vector column name
-            search = self.table.search(query_embedding, vector_column_name="embedding").limit(limit * 2)  # Get more for filtering
+            use_cache = approximate and self.semantic_cache is not None
+            cache_scope = (limit, similarity_threshold, filter_language, filter_type)
+            if use_cache:
+                cached = self.semantic_cache.get(query_embedding, cache_scope)
+                if cached is not None:
+                    return cached
             
-            # Apply filters
-            where_clauses = []
-            if filter_language:
-                where_clauses.append(f"language = '{filter_language}'")
-            if filter_type:
-                where_clauses.append(f"chunk_type = '{filter_type}'")
-            
-            if where_clauses:
-                search = search.where(" AND ".join(where_clauses))
-            
-            # Execute search
-            results = search.to_pandas()
-            
-            if results.empty:
-                return [types.TextContent(type="text", text="No relevant code found.")]
+            response = await self._run_table_query(
+                self._search_table, query_embedding, limit, similarity_threshold, filter_language, filter_type
+            )
+            if use_cache and response[1]:
+                self.semantic_cache.put(query_embedding, response, cache_scope)
             
-            # Filter by similarity threshold and format results
-            filtered_results = []
-            for _, row in results.iterrows():
-                # LanceDB returns _distance, convert to similarity (1 - normalized_distance)
-                similarity = 1 - (row['_distance'] / 2)  # Assuming cosine distance
-                
-                if similarity >= similarity_threshold:
-                    filtered_results.append((row, similarity))
-            
-            # Sort by similarity
-            filtered_results.sort(key=lambda x: x[1], reverse=True)
-            filtered_results = filtered_results[:limit]
-            
-            if not filtered_results:
-                return [types.TextContent(type="text", text=f"No code found with similarity >= {similarity_threshold}")]
-            
-            # Format response
-            response_lines = [f"Found {len(filtered_results)} relevant code snippets:\n"]
-            
-            for i, (row, similarity) in enumerate(filtered_results, 1):
-                response_lines.append(f"Result {i} (similarity: {similarity:.3f}):")
-                response_lines.append(f"File: {row['file_path']}")
-                response_lines.append(f"Type: {row['chunk_type']}")
-                if row['name']:
-                    response_lines.append(f"Name: {row['name']}")
-                response_lines.append(f"Lines: {row['start_line']}-{row['end_line']}")
-                if row['docstring']:
-                    response_lines.append(f"Description: {row['docstring']}")
-                response_lines.append("Code:")
-                response_lines.append("```")
-                response_lines.append(row['content'])
-                response_lines.append("```\n")
-            
-            return [types.TextContent(type="text", text="\n".join(response_lines))]
+            return response
             
         except Exception as e:
-            return [types.TextContent(type="text", text=f"Search failed: {str(e)}")]
+            return f"Search failed: {str(e)}", []
+    
+    def _search_table(self, query_embedding: List[float], limit: int, similarity_threshold: float,
+                      filter_language: Optional[str], filter_type: Optional[str]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run a vector search against the table and render its hits (blocking)."""
+        # Build search - specify the vector column name
+        search = self.table.search(query_embedding, vector_column_name="embedding").limit(limit * 2)  # Get more for filtering
+        
+        # Apply filters
+        where_clauses = []
+        if filter_language:
+            where_clauses.append(f"language = '{filter_language}'")
+        if filter_type:
+            where_clauses.append(f"chunk_type = '{filter_type}'")
+        
+        if where_clauses:
+            search = search.where(" AND ".join(where_clauses))
+        
+        # Execute search
+        results = search.to_pandas()
+        
+        if results.empty:
+            return "No relevant code found.", []
+        
+        # Filter by similarity threshold and format results
+        filtered_results = []
+        for _, row in results.iterrows():
+            # LanceDB returns _distance, convert to similarity (1 - normalized_distance)
+            similarity = 1 - (row['_distance'] / 2)  # Assuming cosine distance
+            
+            if similarity >= similarity_threshold:
+                filtered_results.append((row, similarity))
+        
+        # Sort by similarity
+        filtered_results.sort(key=lambda x: x[1], reverse=True)
+        filtered_results = filtered_results[:limit]
+        
+        if not filtered_results:
+            return f"No code found with similarity >= {similarity_threshold}", []
+        
+        # Format response
+        response_lines = [f"Found {len(filtered_results)} relevant code snippets:\n"]
+        hits = []
+        
+        for i, (row, similarity) in enumerate(filtered_results, 1):
+            response_lines.append(f"Result {i} (similarity: {similarity:.3f}):")
+            response_lines.append(f"File: {row['file_path']}")
+            response_lines.append(f"Type: {row['chunk_type']}")
+            if row['name']:
+                response_lines.append(f"Name: {row['name']}")
+            response_lines.append(f"Lines: {row['start_line']}-{row['end_line']}")
+            if row['docstring']:
+                response_lines.append(f"Description: {row['docstring']}")
+            response_lines.append("Code:")
+            response_lines.append("```")
+            response_lines.append(row['content'])
+            response_lines.append("```\n")
+            hits.append({
+                "code": row['content'],
+                "file_path": row['file_path'],
+                "name": row['name'],
+                "language": row['language'],
+                "chunk_type": row['chunk_type'],
+                "similarity": float(similarity)
+            })
+        
+        return "\n".join(response_lines), hits
+    
+    async def search_code_batch(self, queries: List[str], limit: int = 5, similarity_threshold: float = 0.7,
+                                filter_language: Optional[str] = None,
+                                filter_type: Optional[str] = None) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Run ``search_code_hits`` for several queries with one embedding pass."""
+        vectors = await self.encode_queries(queries)
+        return [
+            await self.search_code_hits(query, limit, similarity_threshold, filter_language,
+                                        filter_type, query_vector=vectors[query])
+            for query in queries
+        ]
+    
+    async def _embed_query(self, query: str) -> List[float]:
+        """Embed one query.
+        
+        A query is encoded right away when no encode is running; queries that
+        arrive while one is share a single batch once it finishes.
+        """
+        loop = asyncio.get_running_loop()
+        if self._embed_loop is not loop:
+            # State left by a loop that stopped mid-encode would never resolve
+            self._embed_loop = loop
+            self._embed_pending = []
+            self._embed_busy = False
+        
+        if self._embed_busy:
+            future = loop.create_future()
+            self._embed_pending.append((query, future))
+            return await future
+        
+        self._embed_busy = True
+        try:
+            vectors = await self.encode_queries([query])
+        finally:
+            self._start_embed_flush()
+        return vectors[query]
+    
+    def _start_embed_flush(self):
+        """Embed the queries that queued up meanwhile, or go idle if there are none.
+        
+        The flush task is held until it finishes, since the loop only keeps
+        weak references to tasks.
+        """
+        if not self._embed_pending:
+            self._embed_busy = False
+            return
+        task = self._embed_loop.create_task(self._flush_embeddings())
+        self._embed_tasks.add(task)
+        task.add_done_callback(self._embed_tasks.discard)
+    
+    async def _flush_embeddings(self):
+        """Embed every pending query in one batch and resolve their futures."""
+        batch, self._embed_pending = self._embed_pending, []
+        try:
+            vectors = await self.encode_queries([query for query, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for query, future in batch:
+                if not future.done():
+                    future.set_result(vectors[query])
+        finally:
+            self._start_embed_flush()
+    
+    async def _run_table_query(self, func, *args):
+        """Run a blocking table query on TABLE_EXECUTOR."""
+        return await asyncio.get_running_loop().run_in_executor(TABLE_EXECUTOR, func, *args)
+    
+    async def _encode(self, sentences, batch_size: int = 32):
+        """Embed text without blocking the event loop.
+        
+        Infinity requests are awaited; a local model runs on the default executor.
+        """
+        if isinstance(self.embedding_model, InfinityEmbedder):
+            return await self.embedding_model.encode(sentences, batch_size=batch_size)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.embedding_model.encode, sentences, batch_size=batch_size)
+        )
+    
+    async def close(self):
+        """Release the embedding backend's connections, if it has any."""
+        if isinstance(self.embedding_model, InfinityEmbedder):
+            await self.embedding_model.aclose()
+    
+    async def encode_queries(self, queries: List[str], batch_size: int = 32) -> Dict[str, List[float]]:
+        """Embed distinct queries in batched forward passes, keyed by query text."""
+        await self.initialize()
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+        
+        # Encode off the event loop so more queries can queue for the next batch
+        embeddings = await self._encode(unique_queries, batch_size=batch_size)
+        return {
+            query: (embedding.tolist() if hasattr(embedding, 'tolist') else [float(x) for x in embedding])
+            for query, embedding in zip(unique_queries, embeddings)
+        }
     
     async def _get_context(self, identifier: str, include_related: bool) -> List[types.TextContent]:
         """Get context for a specific function or class."""
@@ -571,46 +803,51 @@ class CodeRAG:
             return [types.TextContent(type="text", text="RAG system not properly initialized")]
             
         try:
-            # Search for the identifier by name
-            results = self.table.search().where(f"name = '{identifier}'").to_pandas()
-            
-            if results.empty:
-                return [types.TextContent(type="text", text=f"No code found for identifier: {identifier}")]
-            
-            response_lines = [f"Context for '{identifier}':\n"]
-            
-            # Show direct matches
-            for _, row in results.iterrows():
-                response_lines.append(f"Found in: {row['file_path']}")
-                response_lines.append(f"Type: {row['chunk_type']}")
-                response_lines.append(f"Lines: {row['start_line']}-{row['end_line']}")
-                if row['docstring']:
-                    response_lines.append(f"Description: {row['docstring']}")
-                response_lines.append("Code:")
-                response_lines.append("```")
-                response_lines.append(row['content'])
-                response_lines.append("```\n")
-            
-            # If requested, find related code
-            if include_related and not results.empty:
-                # Use the first result to find related code in the same file
-                first_result = results.iloc[0]
-                file_path = first_result['file_path']
-                
-                related_results = self.table.search().where(
-                    f"file_path = '{file_path}' AND name != '{identifier}'"
-                ).limit(3).to_pandas()
-                
-                if not related_results.empty:
-                    response_lines.append("Related code in the same file:")
-                    for _, row in related_results.iterrows():
-                        response_lines.append(f"- {row['name']} ({row['chunk_type']}, lines {row['start_line']}-{row['end_line']})")
-            
-            return [types.TextContent(type="text", text="\n".join(response_lines))]
+            text = await self._run_table_query(self._context_text, identifier, include_related)
+            return [types.TextContent(type="text", text=text)]
             
         except Exception as e:
             return [types.TextContent(type="text", text=f"Failed to get context: {str(e)}")]
     
+    def _context_text(self, identifier: str, include_related: bool) -> str:
+        """Look up an identifier's chunks (and related ones) and render them (blocking)."""
+        # Search for the identifier by name
+        results = self.table.search().where(f"name = '{identifier}'").to_pandas()
+        
+        if results.empty:
+            return f"No code found for identifier: {identifier}"
+        
+        response_lines = [f"Context for '{identifier}':\n"]
+        
+        # Show direct matches
+        for _, row in results.iterrows():
+            response_lines.append(f"Found in: {row['file_path']}")
+            response_lines.append(f"Type: {row['chunk_type']}")
+            response_lines.append(f"Lines: {row['start_line']}-{row['end_line']}")
+            if row['docstring']:
+                response_lines.append(f"Description: {row['docstring']}")
+            response_lines.append("Code:")
+            response_lines.append("```")
+            response_lines.append(row['content'])
+            response_lines.append("```\n")
+        
+        # If requested, find related code
+        if include_related and not results.empty:
+            # Use the first result to find related code in the same file
+            first_result = results.iloc[0]
+            file_path = first_result['file_path']
+            
+            related_results = self.table.search().where(
+                f"file_path = '{file_path}' AND name != '{identifier}'"
+            ).limit(3).to_pandas()
+            
+            if not related_results.empty:
+                response_lines.append("Related code in the same file:")
+                for _, row in related_results.iterrows():
+                    response_lines.append(f"- {row['name']} ({row['chunk_type']}, lines {row['start_line']}-{row['end_line']})")
+        
+        return "\n".join(response_lines)
+    
     async def _rag_status(self) -> List[types.TextContent]:
         """Get RAG system status."""
         if not DEPENDENCIES_AVAILABLE:
@@ -621,7 +858,7 @@ class CodeRAG:
             
         try:
             # Get table stats
-            table_df = self.table.to_pandas()
+            table_df = await self._run_table_query(self.table.to_pandas)
             total_records = len(table_df)
             
             # Get file statistics
@@ -671,13 +908,16 @@ class CodeRAG:
             )]
         
         try:
+            if self.semantic_cache is not None:
+                self.semantic_cache.clear()
+            
             # Drop and recreate table
             self.db.drop_table("code_chunks")
             
             # Recreate empty table with correct schema
             if self.embedding_model:
                 # Get the actual embedding dimension from the model
-                test_embedding = self.embedding_model.encode(["test"])
+                test_embedding = await self._encode(["test"])
                 embedding_dim = len(test_embedding[0])
             else:
                 embedding_dim = 384  # Default dimension for all-MiniLM-L6-v2
@@ -140,13 +140,13 @@ async def handle_read_resource(uri: AnyUrl) -> str:
             path = str(uri.path).lstrip("/directory/") if uri.path else ""
             if os.path.isdir(path):
                 files = []
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-                    files.append({
-                        "name": item,
-                        "type": "directory" if os.path.isdir(item_path) else "file",
-                        "size": os.path.getsize(item_path) if os.path.isfile(item_path) else None
-                    })
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        files.append({
+                            "name": entry.name,
+                            "type": "directory" if entry.is_dir() else "file",
+                            "size": entry.stat().st_size if entry.is_file() else None
+                        })
                 return str({"path": path, "contents": files})
             else:
                 return f"Path not found: {path}"
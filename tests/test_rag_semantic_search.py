@@ -8,9 +8,11 @@ import asyncio
 import sys
 import os
 import json
+import time
 from pathlib import Path
+from types import MappingProxyType
 from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -18,6 +20,141 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from code_dev_assistant.rag_system import CodeRAG
 
 
+def _case(fields: Dict[str, Any]) -> MappingProxyType:
+    """Freeze a test case and precompute its lowercase query and concepts."""
+    case = dict(fields)
+    case["query_ci"] = case["query"].lower()
+    case["expected_ci"] = tuple(concept.lower() for concept in case.get("expected", ()))
+    return MappingProxyType(case)
+
+
+# Test plans are built once at import time and shared by every run
+BASIC_FUNCTIONALITY_CASES = (
+    _case({
+        "name": "Database Operations",
+        "query": "database operations and connections",
+        "expected": ["database", "db", "connect", "table", "lance"],
+        "min_results": 1
+    }),
+    _case({
+        "name": "File Analysis",
+        "query": "analyze code files and extract functions",
+        "expected": ["analyze", "file", "function", "extract", "ast"],
+        "min_results": 2
+    }),
+    _case({
+        "name": "Web Interface",
+        "query": "web application routes and endpoints",
+        "expected": ["route", "app", "endpoint", "api", "web"],
+        "min_results": 1
+    }),
+    _case({
+        "name": "Git Operations",
+        "query": "git version control operations",
+        "expected": ["git", "commit", "branch", "repository"],
+        "min_results": 1
+    })
+)
+
+SEMANTIC_UNDERSTANDING_CASES = (
+    _case({
+        "name": "Natural Language Query",
+        "query": "functions that handle user authentication and login",
+        "expected": ["function", "user", "auth", "login", "handle"],
+        "min_results": 1
+    }),
+    _case({
+        "name": "Code Pattern Recognition",
+        "query": "error handling and exception management",
+        "expected": ["error", "exception", "try", "catch", "handle"],
+        "min_results": 1
+    }),
+    _case({
+        "name": "Data Processing",
+        "query": "parse and process data structures",
+        "expected": ["parse", "process", "data", "structure"],
+        "min_results": 1
+    }),
+    _case({
+        "name": "Configuration Management",
+        "query": "configuration setup and initialization",
+        "expected": ["config", "setup", "init", "configure"],
+        "min_results": 1
+    })
+)
+
+LANGUAGE_FILTER_CASES = (
+    _case({
+        "name": "Python Filter",
+        "query": "class definitions",
+        "filter_language": "python",
+        "expected": ["class", "def", "python"]
+    }),
+    _case({
+        "name": "No Filter",
+        "query": "class definitions",
+        "filter_language": None,
+        "expected": ["class", "def"]
+    })
+)
+
+CHUNK_TYPE_FILTER_CASES = (
+    _case({
+        "name": "Function Filter",
+        "query": "code implementation",
+        "filter_type": "functiondef",
+        "expected": ["def", "function"]
+    }),
+    _case({
+        "name": "Class Filter",
+        "query": "object definitions",
+        "filter_type": "classdef",
+        "expected": ["class"]
+    }),
+    _case({
+        "name": "Import Filter",
+        "query": "dependencies",
+        "filter_type": "imports",
+        "expected": ["import", "from"]
+    })
+)
+
+EDGE_CASES = (
+    _case({
+        "name": "Empty Query",
+        "query": "",
+        "expected_error": True
+    }),
+    _case({
+        "name": "Very Specific Query",
+        "query": "async def _find_class implementation with search_path parameter",
+        "expected_error": False
+    }),
+    _case({
+        "name": "Nonsense Query",
+        "query": "xyzabc123 nonexistent blahblah",
+        "expected_error": False  # Should return no results, not error
+    }),
+    _case({
+        "name": "High Similarity Threshold",
+        "query": "function definition",
+        "similarity_threshold": 0.95,
+        "expected_error": False
+    })
+)
+
+SIMILARITY_THRESHOLD_QUERY = "code analysis and parsing"
+SIMILARITY_THRESHOLDS = (0.9, 0.8, 0.7, 0.6, 0.5)
+
+PERFORMANCE_QUERIES = (
+    "function definitions and implementations",
+    "class structure and methods",
+    "database operations and queries",
+    "error handling and exceptions",
+    "configuration and setup"
+)
+
+
 class RAGSemanticSearchTester:
     """Test suite for RAG semantic search functionality."""
     
@@ -27,14 +164,38 @@ class RAGSemanticSearchTester:
         self.test_results = []
         self.total_tests = 0
         self.passed_tests = 0
+        self._query_vec: Dict[str, List[float]] = {}
+        # One wall-clock baseline; per-result times are monotonic offsets from it
+        self._t0_wall = datetime.now()
+        self._t0_mono = time.perf_counter_ns()
+        # Progress lines are buffered and written once for non-interactive runs
+        self._buffer_output = not os.isatty(1) or bool(os.environ.get("RAG_QUIET"))
+        self._log: List[str] = []
         
     async def initialize(self):
         """Initialize the RAG system."""
         print("🔧 Initializing RAG system...")
-        self.rag_system = CodeRAG()
+        # RAG_EMBEDDING_BACKEND=infinity points embeddings at a running Infinity server
+        self.rag_system = CodeRAG(
+            embedding_backend=os.environ.get("RAG_EMBEDDING_BACKEND", "local"),
+            infinity_url=os.environ.get("INFINITY_URL", "http://localhost:7997")
+        )
         await self.rag_system.initialize()
         print("✅ RAG system initialized successfully")
         
+    def _p(self, msg: str = ""):
+        """Emit a progress line, buffering it when output is not interactive."""
+        if self._buffer_output:
+            self._log.append(msg + "\n")
+        else:
+            print(msg)
+    
+    async def query_vector(self, query: str) -> List[float]:
+        """Return the embedding for a query, encoding each distinct query only once."""
+        if query not in self._query_vec:
+            self._query_vec.update(await self.rag_system.encode_queries([query]))
+        return self._query_vec[query]
+        
     def log_test_result(self, test_name: str, query: str, results: str, 
                        expected_concepts: List[str], passed: bool, notes: str = ""):
         """Log a test result."""
@@ -45,26 +206,27 @@ class RAGSemanticSearchTester:
             "expected_concepts": expected_concepts,
             "passed": passed,
             "notes": notes,
-            "timestamp": datetime.now().isoformat()
+            "_ns": time.perf_counter_ns() - self._t0_mono
         })
         self.total_tests += 1
         if passed:
             self.passed_tests += 1
     
-    def evaluate_search_results(self, results: str, expected_concepts: List[str], 
+    def evaluate_search_results(self, hits: List[Dict[str, Any]], expected_concepts: List[str], 
                                min_results: int = 1) -> Tuple[bool, str]:
-        """Evaluate if search results contain expected concepts."""
-        if "No relevant code found" in results or "No code found" in results:
+        """Evaluate if structured search hits contain expected (lowercase) concepts."""
+        if not hits:
             return False, "No results returned"
         
-        # Count how many expected concepts are found
+        # Match concepts against the code snippets only, not the rendered headers
+        hit_text = "\n".join(hit["code"] for hit in hits).lower()
         found_concepts = []
         for concept in expected_concepts:
-            if concept.lower() in results.lower():
+            if concept in hit_text:
                 found_concepts.append(concept)
         
         # Check if we have minimum results
-        result_count = results.count("Result ")
+        result_count = len(hits)
         if result_count < min_results:
             return False, f"Insufficient results: {result_count} < {min_results}"
         
@@ -77,53 +239,27 @@ class RAGSemanticSearchTester:
 
     async def test_basic_functionality_search(self):
         """Test basic functionality searches."""
-        print("\n📋 Testing Basic Functionality Searches...")
-        
-        test_cases = [
-            {
-                "name": "Database Operations",
-                "query": "database operations and connections",
-                "expected": ["database", "db", "connect", "table", "lance"],
-                "min_results": 1
-            },
-            {
-                "name": "File Analysis",
-                "query": "analyze code files and extract functions",
-                "expected": ["analyze", "file", "function", "extract", "ast"],
-                "min_results": 2
-            },
-            {
-                "name": "Web Interface",
-                "query": "web application routes and endpoints",
-                "expected": ["route", "app", "endpoint", "api", "web"],
-                "min_results": 1
-            },
-            {
-                "name": "Git Operations",
-                "query": "git version control operations",
-                "expected": ["git", "commit", "branch", "repository"],
-                "min_results": 1
-            }
-        ]
+        self._p("\n📋 Testing Basic Functionality Searches...")
         
-        for test_case in test_cases:
-            print(f"  🔍 Testing: {test_case['name']}")
+        
+        for test_case in BASIC_FUNCTIONALITY_CASES:
+            self._p(f"  🔍 Testing: {test_case['name']}")
             try:
-                result = await self.rag_system.execute_rag_tool('search_code', {
-                    'query': test_case['query'],
-                    'limit': 5,
-                    'similarity_threshold': 0.6
-                })
+                results_text, hits = await self.rag_system.search_code_hits(
+                    test_case['query'],
+                    limit=5,
+                    similarity_threshold=0.6,
+                    query_vector=await self.query_vector(test_case['query'])
+                )
                 
-                results_text = result[0].text if result else "No results"
                 passed, notes = self.evaluate_search_results(
-                    results_text, 
-                    test_case['expected'], 
+                    hits, 
+                    test_case['expected_ci'], 
                     test_case['min_results']
                 )
                 
                 status = "✅" if passed else "❌"
-                print(f"    {status} {test_case['name']}: {notes}")
+                self._p(f"    {status} {test_case['name']}: {notes}")
                 
                 self.log_test_result(
                     test_case['name'],
@@ -135,7 +271,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ {test_case['name']}: Error - {str(e)}")
+                self._p(f"    ❌ {test_case['name']}: Error - {str(e)}")
                 self.log_test_result(
                     test_case['name'],
                     test_case['query'],
@@ -147,53 +283,27 @@ class RAGSemanticSearchTester:
 
     async def test_semantic_understanding(self):
         """Test semantic understanding capabilities."""
-        print("\n🧠 Testing Semantic Understanding...")
-        
-        test_cases = [
-            {
-                "name": "Natural Language Query",
-                "query": "functions that handle user authentication and login",
-                "expected": ["function", "user", "auth", "login", "handle"],
-                "min_results": 1
-            },
-            {
-                "name": "Code Pattern Recognition",
-                "query": "error handling and exception management",
-                "expected": ["error", "exception", "try", "catch", "handle"],
-                "min_results": 1
-            },
-            {
-                "name": "Data Processing",
-                "query": "parse and process data structures",
-                "expected": ["parse", "process", "data", "structure"],
-                "min_results": 1
-            },
-            {
-                "name": "Configuration Management",
-                "query": "configuration setup and initialization",
-                "expected": ["config", "setup", "init", "configure"],
-                "min_results": 1
-            }
-        ]
+        self._p("\n🧠 Testing Semantic Understanding...")
         
-        for test_case in test_cases:
-            print(f"  🔍 Testing: {test_case['name']}")
+        
+        for test_case in SEMANTIC_UNDERSTANDING_CASES:
+            self._p(f"  🔍 Testing: {test_case['name']}")
             try:
-                result = await self.rag_system.execute_rag_tool('search_code', {
-                    'query': test_case['query'],
-                    'limit': 5,
-                    'similarity_threshold': 0.5  # Lower threshold for semantic matching
-                })
+                results_text, hits = await self.rag_system.search_code_hits(
+                    test_case['query'],
+                    limit=5,
+                    similarity_threshold=0.5,  # Lower threshold for semantic matching
+                    query_vector=await self.query_vector(test_case['query'])
+                )
                 
-                results_text = result[0].text if result else "No results"
                 passed, notes = self.evaluate_search_results(
-                    results_text, 
-                    test_case['expected'], 
+                    hits, 
+                    test_case['expected_ci'], 
                     test_case['min_results']
                 )
                 
                 status = "✅" if passed else "❌"
-                print(f"    {status} {test_case['name']}: {notes}")
+                self._p(f"    {status} {test_case['name']}: {notes}")
                 
                 self.log_test_result(
                     test_case['name'],
@@ -205,7 +315,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ {test_case['name']}: Error - {str(e)}")
+                self._p(f"    ❌ {test_case['name']}: Error - {str(e)}")
                 self.log_test_result(
                     test_case['name'],
                     test_case['query'],
@@ -217,31 +327,30 @@ class RAGSemanticSearchTester:
 
     async def test_similarity_thresholds(self):
         """Test different similarity thresholds."""
-        print("\n📊 Testing Similarity Thresholds...")
+        self._p("\n📊 Testing Similarity Thresholds...")
         
-        query = "code analysis and parsing"
-        thresholds = [0.9, 0.8, 0.7, 0.6, 0.5]
+        query = SIMILARITY_THRESHOLD_QUERY
         
-        for threshold in thresholds:
-            print(f"  🎯 Testing threshold: {threshold}")
+        for threshold in SIMILARITY_THRESHOLDS:
+            self._p(f"  🎯 Testing threshold: {threshold}")
             try:
-                result = await self.rag_system.execute_rag_tool('search_code', {
-                    'query': query,
-                    'limit': 5,
-                    'similarity_threshold': threshold
-                })
+                results_text, hits = await self.rag_system.search_code_hits(
+                    query,
+                    limit=5,
+                    similarity_threshold=threshold,
+                    query_vector=await self.query_vector(query)
+                )
                 
-                results_text = result[0].text if result else "No results"
-                result_count = results_text.count("Result ") if "Result " in results_text else 0
+                result_count = len(hits)
                 
-                if "No code found" in results_text or result_count == 0:
+                if result_count == 0:
                     status = "❌"
                     notes = "No results"
                 else:
                     status = "✅"
                     notes = f"{result_count} results found"
                 
-                print(f"    {status} Threshold {threshold}: {notes}")
+                self._p(f"    {status} Threshold {threshold}: {notes}")
                 
                 self.log_test_result(
                     f"Threshold {threshold}",
@@ -253,7 +362,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ Threshold {threshold}: Error - {str(e)}")
+                self._p(f"    ❌ Threshold {threshold}: Error - {str(e)}")
                 self.log_test_result(
                     f"Threshold {threshold}",
                     query,
@@ -265,46 +374,28 @@ class RAGSemanticSearchTester:
 
     async def test_language_filtering(self):
         """Test language-specific filtering."""
-        print("\n🔤 Testing Language Filtering...")
-        
-        test_cases = [
-            {
-                "name": "Python Filter",
-                "query": "class definitions",
-                "filter_language": "python",
-                "expected": ["class", "def", "python"]
-            },
-            {
-                "name": "No Filter",
-                "query": "class definitions",
-                "filter_language": None,
-                "expected": ["class", "def"]
-            }
-        ]
+        self._p("\n🔤 Testing Language Filtering...")
         
-        for test_case in test_cases:
-            print(f"  🔍 Testing: {test_case['name']}")
+        
+        for test_case in LANGUAGE_FILTER_CASES:
+            self._p(f"  🔍 Testing: {test_case['name']}")
             try:
-                search_params = {
-                    'query': test_case['query'],
-                    'limit': 5,
-                    'similarity_threshold': 0.6
-                }
-                
-                if test_case['filter_language']:
-                    search_params['filter_language'] = test_case['filter_language']
-                
-                result = await self.rag_system.execute_rag_tool('search_code', search_params)
+                results_text, hits = await self.rag_system.search_code_hits(
+                    test_case['query'],
+                    limit=5,
+                    similarity_threshold=0.6,
+                    filter_language=test_case['filter_language'],
+                    query_vector=await self.query_vector(test_case['query'])
+                )
                 
-                results_text = result[0].text if result else "No results"
                 passed, notes = self.evaluate_search_results(
-                    results_text, 
-                    test_case['expected'], 
+                    hits, 
+                    test_case['expected_ci'], 
                     1
                 )
                 
                 status = "✅" if passed else "❌"
-                print(f"    {status} {test_case['name']}: {notes}")
+                self._p(f"    {status} {test_case['name']}: {notes}")
                 
                 self.log_test_result(
                     test_case['name'],
@@ -316,7 +407,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ {test_case['name']}: Error - {str(e)}")
+                self._p(f"    ❌ {test_case['name']}: Error - {str(e)}")
                 self.log_test_result(
                     test_case['name'],
                     test_case['query'],
@@ -328,48 +419,28 @@ class RAGSemanticSearchTester:
 
     async def test_chunk_type_filtering(self):
         """Test chunk type filtering."""
-        print("\n📦 Testing Chunk Type Filtering...")
-        
-        test_cases = [
-            {
-                "name": "Function Filter",
-                "query": "code implementation",
-                "filter_type": "functiondef",
-                "expected": ["def", "function"]
-            },
-            {
-                "name": "Class Filter", 
-                "query": "object definitions",
-                "filter_type": "classdef",
-                "expected": ["class"]
-            },
-            {
-                "name": "Import Filter",
-                "query": "dependencies",
-                "filter_type": "imports",
-                "expected": ["import", "from"]
-            }
-        ]
+        self._p("\n📦 Testing Chunk Type Filtering...")
+        
         
-        for test_case in test_cases:
-            print(f"  🔍 Testing: {test_case['name']}")
+        for test_case in CHUNK_TYPE_FILTER_CASES:
+            self._p(f"  🔍 Testing: {test_case['name']}")
             try:
-                result = await self.rag_system.execute_rag_tool('search_code', {
-                    'query': test_case['query'],
-                    'limit': 5,
-                    'similarity_threshold': 0.5,
-                    'filter_type': test_case['filter_type']
-                })
-                
-                results_text = result[0].text if result else "No results"
+                results_text, hits = await self.rag_system.search_code_hits(
+                    test_case['query'],
+                    limit=5,
+                    similarity_threshold=0.5,
+                    filter_type=test_case['filter_type'],
+                    query_vector=await self.query_vector(test_case['query'])
+                )
+                
                 passed, notes = self.evaluate_search_results(
-                    results_text, 
-                    test_case['expected'], 
+                    hits, 
+                    test_case['expected_ci'], 
                     1
                 )
                 
                 status = "✅" if passed else "❌"
-                print(f"    {status} {test_case['name']}: {notes}")
+                self._p(f"    {status} {test_case['name']}: {notes}")
                 
                 self.log_test_result(
                     test_case['name'],
@@ -381,7 +452,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ {test_case['name']}: Error - {str(e)}")
+                self._p(f"    ❌ {test_case['name']}: Error - {str(e)}")
                 self.log_test_result(
                     test_case['name'],
                     test_case['query'],
@@ -393,43 +464,17 @@ class RAGSemanticSearchTester:
 
     async def test_edge_cases(self):
         """Test edge cases and error handling."""
-        print("\n⚠️  Testing Edge Cases...")
+        self._p("\n⚠️  Testing Edge Cases...")
         
-        test_cases = [
-            {
-                "name": "Empty Query",
-                "query": "",
-                "expected_error": True
-            },
-            {
-                "name": "Very Specific Query",
-                "query": "async def _find_class implementation with search_path parameter",
-                "expected_error": False
-            },
-            {
-                "name": "Nonsense Query",
-                "query": "xyzabc123 nonexistent blahblah",
-                "expected_error": False  # Should return no results, not error
-            },
-            {
-                "name": "High Similarity Threshold",
-                "query": "function definition",
-                "similarity_threshold": 0.95,
-                "expected_error": False
-            }
-        ]
         
-        for test_case in test_cases:
-            print(f"  🔍 Testing: {test_case['name']}")
+        for test_case in EDGE_CASES:
+            self._p(f"  🔍 Testing: {test_case['name']}")
             try:
-                search_params = {
-                    'query': test_case['query'],
-                    'limit': 5,
-                    'similarity_threshold': test_case.get('similarity_threshold', 0.7)
-                }
-                
-                result = await self.rag_system.execute_rag_tool('search_code', search_params)
-                results_text = result[0].text if result else "No results"
+                results_text, hits = await self.rag_system.search_code_hits(
+                    test_case['query'],
+                    limit=5,
+                    similarity_threshold=test_case.get('similarity_threshold', 0.7)
+                )
                 
                 if test_case['expected_error']:
                     # For empty query, we expect an error or no results
@@ -449,7 +494,7 @@ class RAGSemanticSearchTester:
                         notes = "Query processed successfully"
                 
                 status = "✅" if passed else "❌"
-                print(f"    {status} {test_case['name']}: {notes}")
+                self._p(f"    {status} {test_case['name']}: {notes}")
                 
                 self.log_test_result(
                     test_case['name'],
@@ -462,7 +507,7 @@ class RAGSemanticSearchTester:
                 
             except Exception as e:
                 if test_case['expected_error']:
-                    print(f"    ✅ {test_case['name']}: Expected error - {str(e)}")
+                    self._p(f"    ✅ {test_case['name']}: Expected error - {str(e)}")
                     self.log_test_result(
                         test_case['name'],
                         test_case['query'],
@@ -472,7 +517,7 @@ class RAGSemanticSearchTester:
                         f"Expected exception: {str(e)}"
                     )
                 else:
-                    print(f"    ❌ {test_case['name']}: Unexpected error - {str(e)}")
+                    self._p(f"    ❌ {test_case['name']}: Unexpected error - {str(e)}")
                     self.log_test_result(
                         test_case['name'],
                         test_case['query'],
@@ -484,38 +529,29 @@ class RAGSemanticSearchTester:
 
     async def test_performance(self):
         """Test search performance."""
-        print("\n⚡ Testing Performance...")
+        self._p("\n⚡ Testing Performance...")
         
-        import time
-        
-        queries = [
-            "function definitions and implementations",
-            "class structure and methods",
-            "database operations and queries",
-            "error handling and exceptions",
-            "configuration and setup"
-        ]
+        queries = PERFORMANCE_QUERIES
         
         total_time = 0
         successful_searches = 0
         
         for i, query in enumerate(queries, 1):
-            print(f"  🔍 Performance test {i}/5: {query[:30]}...")
+            self._p(f"  🔍 Performance test {i}/5: {query[:30]}...")
             try:
                 start_time = time.time()
                 
-                result = await self.rag_system.execute_rag_tool('search_code', {
-                    'query': query,
-                    'limit': 5,
-                    'similarity_threshold': 0.6
-                })
+                results_text, hits = await self.rag_system.search_code_hits(
+                    query,
+                    limit=5,
+                    similarity_threshold=0.6
+                )
                 
                 end_time = time.time()
                 search_time = end_time - start_time
                 total_time += search_time
                 
-                results_text = result[0].text if result else "No results"
-                has_results = "Result " in results_text
+                has_results = bool(hits)
                 
                 if has_results:
                     successful_searches += 1
@@ -523,7 +559,7 @@ class RAGSemanticSearchTester:
                 else:
                     status = "⚠️"
                 
-                print(f"    {status} Search {i}: {search_time:.3f}s {'(results found)' if has_results else '(no results)'}")
+                self._p(f"    {status} Search {i}: {search_time:.3f}s {'(results found)' if has_results else '(no results)'}")
                 
                 self.log_test_result(
                     f"Performance Test {i}",
@@ -535,7 +571,7 @@ class RAGSemanticSearchTester:
                 )
                 
             except Exception as e:
-                print(f"    ❌ Search {i}: Error - {str(e)}")
+                self._p(f"    ❌ Search {i}: Error - {str(e)}")
                 self.log_test_result(
                     f"Performance Test {i}",
                     query,
@@ -548,15 +584,20 @@ class RAGSemanticSearchTester:
         avg_time = total_time / len(queries) if queries else 0
         success_rate = (successful_searches / len(queries)) * 100 if queries else 0
         
-        print(f"  📊 Performance Summary:")
-        print(f"    • Average search time: {avg_time:.3f}s")
-        print(f"    • Success rate: {success_rate:.1f}% ({successful_searches}/{len(queries)})")
-        print(f"    • Total time: {total_time:.3f}s")
+        self._p(f"  📊 Performance Summary:")
+        self._p(f"    • Average search time: {avg_time:.3f}s")
+        self._p(f"    • Success rate: {success_rate:.1f}% ({successful_searches}/{len(queries)})")
+        self._p(f"    • Total time: {total_time:.3f}s")
 
     def save_test_results(self):
         """Save test results to a JSON file."""
         results_file = Path(__file__).parent / "tests/rag_test_results.json"
         
+        for result in self.test_results:
+            if "_ns" in result:
+                offset = timedelta(microseconds=result.pop("_ns") // 1000)
+                result["timestamp"] = (self._t0_wall + offset).isoformat()
+        
         summary = {
             "test_summary": {
                 "total_tests": self.total_tests,
@@ -575,6 +616,9 @@ class RAGSemanticSearchTester:
 
     def print_summary(self):
         """Print test summary."""
+        if self._log:
+            sys.stdout.write("".join(self._log))
+            self._log.clear()
         print("\n" + "="*60)
         print("🎯 RAG SEMANTIC SEARCH TEST SUMMARY")
         print("="*60)
@@ -604,6 +648,15 @@ class RAGSemanticSearchTester:
         
         await self.initialize()
         
+        # Embed every distinct query of the filter/threshold suites in one batch
+        planned_queries = [SIMILARITY_THRESHOLD_QUERY] + [
+            case["query"]
+            for suite in (BASIC_FUNCTIONALITY_CASES, SEMANTIC_UNDERSTANDING_CASES,
+                          LANGUAGE_FILTER_CASES, CHUNK_TYPE_FILTER_CASES)
+            for case in suite
+        ]
+        self._query_vec.update(await self.rag_system.encode_queries(planned_queries))
+        
         # Run all test suites
         await self.test_basic_functionality_search()
         await self.test_semantic_understanding()
@@ -621,7 +674,11 @@ class RAGSemanticSearchTester:
 async def main():
     """Main test runner."""
     tester = RAGSemanticSearchTester()
-    await tester.run_all_tests()
+    try:
+        await tester.run_all_tests()
+    finally:
+        if tester.rag_system is not None:
+            await tester.rag_system.close()
 
 
 if __name__ == "__main__":
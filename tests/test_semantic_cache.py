@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the approximate semantic query cache.
+
+Only numpy is needed; run with pytest or directly as a script.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from code_dev_assistant.semantic_cache import SemanticCache, quantization_error, quantize_int8
+
+DIM = 384  # all-MiniLM-L6-v2 embedding size
+THRESHOLD = 0.9
+
+
+def random_unit(rng, dim=DIM):
+    """A random unit vector."""
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def vector_at_cosine(base, cosine, rng):
+    """A unit vector whose cosine similarity to the unit vector ``base`` is ``cosine``."""
+    noise = rng.standard_normal(base.shape[0]).astype(np.float32)
+    noise -= (noise @ base) * base
+    noise /= np.linalg.norm(noise)
+    return cosine * base + np.sqrt(1 - cosine ** 2) * noise
+
+
+def test_int8_round_trip_near_threshold():
+    """Quantized scores stay within the error bound of the FP32 cosine."""
+    rng = np.random.default_rng(1)
+    worst_error = 0.0
+    for _ in range(500):
+        a = random_unit(rng)
+        b = vector_at_cosine(a, THRESHOLD + rng.uniform(-0.02, 0.02), rng)
+        q, s = quantize_int8(np.stack([a, b]))
+        r = quantization_error(np.stack([a, b]), q, s)
+        approx = float(np.dot(q[0].astype(np.int32), q[1].astype(np.int32)) * s[0] * s[1])
+        exact = float(a @ b)
+        error = abs(approx - exact)
+        assert error <= r[0] + r[1] + r[0] * r[1] + 1e-5
+        worst_error = max(worst_error, error)
+    # int8 keeps about two decimal digits of cosine for these embeddings
+    assert worst_error < 0.01, worst_error
+
+
+def test_hit_above_and_miss_below_threshold():
+    """Lookups just above the threshold hit and just below it miss."""
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        cache = SemanticCache(capacity=8, threshold=THRESHOLD)
+        base = random_unit(rng)
+        cache.put(base, "cached")
+        assert cache.get(base) == "cached"
+        assert cache.get(vector_at_cosine(base, THRESHOLD + 0.002, rng)) == "cached"
+        assert cache.get(vector_at_cosine(base, THRESHOLD - 0.002, rng)) is None
+
+
+def test_best_match_wins():
+    """With several entries over the threshold the most similar one is returned."""
+    rng = np.random.default_rng(3)
+    cache = SemanticCache(capacity=8, threshold=THRESHOLD)
+    query = random_unit(rng)
+    cache.put(vector_at_cosine(query, 0.92, rng), "close")
+    cache.put(vector_at_cosine(query, 0.99, rng), "closest")
+    cache.put(random_unit(rng), "unrelated")
+    assert cache.get(query) == "closest"
+
+
+def test_scopes_are_isolated():
+    """An entry is never returned for a lookup in another scope."""
+    rng = np.random.default_rng(4)
+    cache = SemanticCache(capacity=8, threshold=THRESHOLD)
+    vector = random_unit(rng)
+    cache.put(vector, "python functions", scope=(5, 0.3, "python", "function"))
+    assert cache.get(vector, scope=(5, 0.3, "python", "class")) is None
+    assert cache.get(vector, scope=(10, 0.3, "python", "function")) is None
+    assert cache.get(vector) is None
+    assert cache.get(vector, scope=(5, 0.3, "python", "function")) == "python functions"
+
+
+def test_lru_eviction_order():
+    """The least recently used entry is evicted, and lookups count as use."""
+    rng = np.random.default_rng(5)
+    cache = SemanticCache(capacity=3, threshold=THRESHOLD)
+    a, b, c, d = (random_unit(rng) for _ in range(4))
+    cache.put(a, "a")
+    cache.put(b, "b")
+    cache.put(c, "c")
+    assert cache.get(a) == "a"  # b is now the oldest
+    cache.put(d, "d")
+    assert len(cache) == 3
+    assert cache.get(b) is None
+    assert [cache.get(v) for v in (a, c, d)] == ["a", "c", "d"]
+    cache.put(b, "b")  # a was used before c and d, so it goes next
+    assert cache.get(a) is None
+
+
+def test_clear():
+    """clear() drops every entry and the cache keeps working afterwards."""
+    rng = np.random.default_rng(6)
+    cache = SemanticCache(capacity=4, threshold=THRESHOLD)
+    vectors = [random_unit(rng) for _ in range(4)]
+    for i, vector in enumerate(vectors):
+        cache.put(vector, i)
+    cache.clear()
+    assert len(cache) == 0
+    assert all(cache.get(vector) is None for vector in vectors)
+    cache.put(vectors[0], "again")
+    assert cache.get(vectors[0]) == "again"
+    assert cache.get(vectors[1]) is None
+
+
+def assert_buckets_consistent(cache):
+    """Every live entry sits in exactly its signature's bucket, and nothing else does."""
+    bucketed = [slot for bucket in cache._buckets.values() for slot in bucket]
+    assert sorted(bucketed) == sorted(cache._lru)
+    assert all(cache._buckets.values()), "empty buckets left behind"
+    for slot in cache._lru:
+        assert slot in cache._buckets[cache._signatures[slot]]
+        assert cache._signatures[slot] == cache._signature(cache._exact[slot])
+
+
+def test_lsh_buckets_after_eviction():
+    """A full-size LSH cache keeps its buckets in sync through evictions."""
+    rng = np.random.default_rng(7)
+    cache = SemanticCache(capacity=1024, threshold=THRESHOLD)
+    vectors = [random_unit(rng) for _ in range(1500)]
+    for i, vector in enumerate(vectors):
+        cache.put(vector, i)
+    assert cache.lsh_bits > 0 and cache._planes is not None
+    assert len(cache) == 1024
+    assert_buckets_consistent(cache)
+    # The 476 oldest entries were evicted, the rest still hit exactly
+    assert all(cache.get(vector) is None for vector in vectors[:476])
+    assert all(cache.get(vector) == i for i, vector in enumerate(vectors[476:], 476))
+
+
+def test_lsh_near_duplicate_hits():
+    """Near-duplicates are found at about the recall the module documents."""
+    rng = np.random.default_rng(8)
+    cache = SemanticCache(capacity=1024, threshold=THRESHOLD)
+    vectors = [random_unit(rng) for _ in range(1024)]
+    for i, vector in enumerate(vectors):
+        cache.put(vector, i, scope="search")
+    for cosine, expected_recall in ((0.97, 0.875), (0.95, 0.81)):
+        results = [cache.get(vector_at_cosine(v, cosine, rng), scope="search") for v in vectors]
+        # A bucketed lookup may miss, but never returns the wrong entry
+        assert all(result in (None, i) for i, result in enumerate(results))
+        recall = sum(result is not None for result in results) / len(vectors)
+        assert abs(recall - expected_recall) < 0.04, (cosine, recall)
+    assert all(cache.get(v, scope="other") is None for v in vectors[:100])
+
+
+def test_lsh_clear_empties_buckets():
+    """clear() leaves no bucket behind and the cache refills consistently."""
+    rng = np.random.default_rng(9)
+    cache = SemanticCache(capacity=1024, threshold=THRESHOLD)
+    vectors = [random_unit(rng) for _ in range(1100)]
+    for i, vector in enumerate(vectors):
+        cache.put(vector, i)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache._buckets == {}
+    assert cache.get(vectors[-1]) is None
+    for i, vector in enumerate(vectors[:10]):
+        cache.put(vector, i)
+    assert_buckets_consistent(cache)
+    assert cache.get(vectors[3]) == 3
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-#!/usr/bin/env python3
 """
 Web UI for the Code Development Assistant.
 A Flask-based web interface that provides easy access to all assistant features.
@@ -7,13 +6,29 @@ A Flask-based web interface that provides easy access to all assistant features.
 import os
 import sys
 import asyncio
+import atexit
+import gzip
+import hashlib
+import re
+import stat
 import threading
 import concurrent.futures
+import functools
 import traceback
-import json
-import re
+import tempfile
+import time
+from collections import Counter, OrderedDict
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from types import MappingProxyType
+import orjson
+from flask import Flask, Response, render_template, request, stream_with_context
+from flask.json.provider import JSONProvider
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Add the parent directory to the Python path to import the assistant modules
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -23,7 +38,6 @@ from code_dev_assistant.logger import get_logger, setup_application_logging, log
 
 # Configure comprehensive logging for all components
 # Use centralized logs directory
-import os
 log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
 
 app_loggers = setup_application_logging(
@@ -51,8 +65,35 @@ from code_dev_assistant.config import get_config
 # from code_dev_assistant.llm_client import CodeLLM
 # from code_dev_assistant.coder_agent import CoderAgent
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (used by jsonify, tojson and dict returns)."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+# Bound request bodies (code blobs for explain/refactor/chat) to 16 MB by default
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+
+# Compiled templates are cached on disk across restarts; outside of development
+# the template files are not re-checked for changes on every render.
+_jinja_cache_dir = os.environ.get('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'gentify_jinja_cache'))
+os.makedirs(_jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(_jinja_cache_dir)
+app.jinja_env.auto_reload = bool(os.environ.get('FLASK_DEV'))
 
 # Global instances
 config = None
@@ -65,46 +106,679 @@ coder_agent = None
 # Store the current workspace path
 current_workspace_path = None
 
+# Per-workspace RAG databases live under <project>/databases/rag/<workspace name>
+RAG_DB_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'databases', 'rag'))
+
+# Workspace whose RAG/LLM/agent objects have not been constructed yet, and the
+# request paths that construct them (importing the RAG stack is itself slow)
+_pending_component_build = None
+COMPONENT_BUILD_PREFIXES = ('/api/rag/', '/api/llm/', '/api/chat', '/api/agent/', '/api/mcp/')
+# Static endpoints under those prefixes that never touch the components
+NO_SETUP_PATHS = frozenset({'/api/rag/suggestions'})
+
+# Workspace whose slow backend setup (embedding model, project indexing) was
+# deferred at startup, and the request paths that trigger it
+_pending_workspace_setup = None
+_components_lock = threading.RLock()
+# Bumped by every workspace selection; a backend setup whose generation is no
+# longer current has been superseded. ``_backend_ready`` is set once the
+# current generation's setup has finished, and ``_backend_setup_started``
+# records that a thread has taken it on.
+_workspace_generation = 0
+_backend_ready = threading.Event()
+_backend_setup_started = False
+DEFERRED_SETUP_PREFIXES = ('/api/rag/', '/api/chat', '/api/agent/')
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+    
+    def __init__(self, maxsize=128, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Return the live value for ``key`` or ``default``."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
 
-@log_function_calls(web_ui_logger)
-def run_async(coro):
-    """Run async function in a thread-safe way for Flask."""
-    web_ui_logger.debug(f"Starting async operation: {type(coro).__name__}")
-    import concurrent.futures
+
+# Serialized /api/rag/search (basic and advanced) and /api/rag/context
+# responses; cleared whenever the index changes
+rag_search_cache = TTLCache(maxsize=512, ttl=300)
+rag_context_cache = TTLCache(maxsize=256, ttl=300)
+
+# Tool outputs that report a failure rather than a result and must not be cached
+RAG_FAILURE_PREFIXES = (
+    'Search failed', 'RAG operation failed', 'RAG system not properly initialized',
+    'RAG system dependencies not available', 'Failed to get context'
+)
+
+
+def rag_cache_key(kind, params):
+    """Compact cache key for a RAG request of the given kind."""
+    return kind + ':' + hashlib.blake2b(
+        orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+
+
+def clear_rag_caches():
+    """Drop every cached RAG response (after indexing, clearing or a workspace switch)."""
+    rag_search_cache.clear()
+    rag_context_cache.clear()
+
+# Branch listing is polled by the dashboard but rarely changes within seconds
+git_branches_cache = TTLCache(maxsize=4, ttl=5)
+
+# Chat git context, keyed by the repository plus the mtimes of .git/HEAD and
+# .git/index. Edits to tracked files don't touch either, so entries also expire
+# quickly to keep the unstaged list from going stale.
+git_context_cache = TTLCache(maxsize=4, ttl=10)
+# Marked line of GitTools' branch listing ("   main" / " * main")
+CURRENT_BRANCH_RE = re.compile(r'^\s*\*\s*(.+)$', re.M)
+
+
+def git_state_key(repo_path):
+    """Return a cache key for the repository's HEAD and index, or None."""
+    git_dir = os.path.join(repo_path, '.git')
+    try:
+        return (
+            repo_path,
+            os.stat(os.path.join(git_dir, 'HEAD')).st_mtime_ns,
+            os.stat(os.path.join(git_dir, 'index')).st_mtime_ns
+        )
+    except OSError:
+        # Worktrees/submodules (.git is a file) or an empty repository
+        return None
+
+# File-type counts and top-level project overview for the chat's workspace
+# and project-structure context, keyed by workspace path and stored with the
+# root directory's mtime at scan time. Both collectors share one walk.
+workspace_scan_cache = TTLCache(maxsize=4, ttl=30)
+workspace_scan_lock = threading.Lock()
+WORKSPACE_SKIP_DIRS = frozenset({'__pycache__', 'node_modules', 'build', 'dist'})
+# Existence of the configured workspace for /api/initialization_status, which
+# the frontend polls; a couple of seconds of staleness is harmless there
+workspace_exists_cache = TTLCache(maxsize=8, ttl=2)
+
+
+def directory_stat(path):
+    """Return the ``os.stat`` result for ``path`` if it is a directory, else None."""
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st if stat.S_ISDIR(st.st_mode) else None
+
+
+def validated_workspace(path):
+    """Return ``path`` made absolute if it is an existing directory, else None."""
+    path = os.path.abspath(path)
+    return path if directory_stat(path) is not None else None
+
+
+def workspace_exists(path):
+    """Cached ``os.path.exists`` for the status poll."""
+    exists = workspace_exists_cache.get(path)
+    if exists is None:
+        exists = os.path.exists(path)
+        workspace_exists_cache.set(path, exists)
+    return exists
+
+
+# Directory picker: names that mark a subdirectory as a code project, the
+# files it lists, and per-directory project flags keyed by (path, mtime) so
+# adding or removing an indicator invalidates the entry
+PROJECT_INDICATORS = frozenset({'.git', 'package.json', 'pyproject.toml', 'setup.py', 'Cargo.toml', 'go.mod'})
+BROWSE_LISTED_FILES = frozenset({'README.md', 'package.json', 'pyproject.toml', 'setup.py', 'Cargo.toml', 'go.mod'})
+BROWSE_HIDDEN_DIRS = frozenset({'.git', '.github', '.vscode'})
+BROWSE_LIMIT = 2000  # entries returned per listing unless the client asks for another limit
+project_dir_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+# Filtered, sorted listings for the directory picker keyed by (path, mtime,
+# inode); a changed directory gets a new key. Project flags are not
+# stored here since they depend on each subdirectory's own contents.
+browse_listing_cache = TTLCache(maxsize=128, ttl=300)
+# Plain file/subdirectory listings for /api/directory/browse, same keying
+directory_listing_cache = TTLCache(maxsize=128, ttl=300)
+
+
+def is_project_dir(path):
+    """Return whether the directory ``path`` directly contains a project indicator."""
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+        cached = project_dir_cache.get(key)
+        if cached is not None:
+            return cached
+        # One listing instead of an exists() probe per indicator
+        with os.scandir(path) as children:
+            is_project = any(child.name in PROJECT_INDICATORS for child in children)
+    except OSError:
+        return False
+    project_dir_cache.set(key, is_project)
+    return is_project
+
+
+def list_picker_directory(path, st, limit):
+    """Return ``(subdirs, files, total)`` for the directory picker.
     
-    def _run_in_thread():
-        """Run the coroutine in a separate thread with its own event loop."""
-        thread_id = threading.get_ident()
-        web_ui_logger.debug(f"Running coroutine in thread {thread_id}")
+    ``subdirs`` holds ``(name, path)`` pairs and ``files`` the listed project
+    files, both sorted by name. Hidden entries other than BROWSE_HIDDEN_DIRS
+    are skipped. At most ``limit`` entries are returned, always the first ones
+    by name, with the listed files kept ahead of subdirectories; ``total`` is
+    the number of entries before that cut. ``st`` is the directory's stat
+    result, used to key the cache.
+    """
+    key = (path, st.st_mtime_ns, st.st_ino)
+    cached = browse_listing_cache.get(key)
+    if cached is None:
+        subdirs = []
+        files = []
+        with os.scandir(path) as it:
+            for entry in it:
+                item = entry.name
+                
+                # Skip hidden files/directories except important ones
+                if item.startswith('.') and item not in BROWSE_HIDDEN_DIRS:
+                    continue
+                
+                if entry.is_dir():
+                    subdirs.append((item, entry.path))
+                elif item in BROWSE_LISTED_FILES:
+                    # Only include important files
+                    files.append({
+                        'name': item,
+                        'path': entry.path
+                    })
         
-        # Create a new event loop for this thread
-        loop = asyncio.new_event_loop()
+        subdirs.sort()
+        files.sort(key=lambda item: item['name'])
+        cached = (subdirs, files)
+        browse_listing_cache.set(key, cached)
+    
+    subdirs, files = cached
+    total = len(subdirs) + len(files)
+    files = files[:limit]
+    return subdirs[:limit - len(files)], files, total
+
+
+PROJECT_IMPORTANT_FILES = frozenset({
+    'readme.md', 'requirements.txt', 'package.json', 'pyproject.toml',
+    'setup.py', 'dockerfile', 'docker-compose.yml', 'makefile',
+    '.gitignore', 'license'
+})
+
+
+# Response compression for text-heavy payloads (RAG/LLM output, HTML pages).
+# Brotli is preferred when installed; streamed (SSE) responses are left as-is
+# so each event reaches the client as soon as it is written.
+app.config.setdefault('COMPRESS_MIMETYPES', ('application/json', 'text/html'))
+app.config.setdefault('COMPRESS_ALGORITHM', ('br', 'gzip') if brotli else ('gzip',))
+app.config.setdefault('COMPRESS_LEVEL', 4)
+app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=app.config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL'])
+
+
+def _weaken_etag(response):
+    """Mark a strong ETag weak once the body is (or would be) content-encoded.
+
+    The ETag is computed on the identity payload, which differs byte-for-byte
+    from its gzip and br encodings. Conditional GETs compare If-None-Match
+    weakly, so 304s keep working.
+    """
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON/HTML responses above the size threshold for clients that accept it."""
+    if (response.mimetype not in app.config['COMPRESS_MIMETYPES']
+            or response.status_code not in (200, 304)
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = next((e for e in app.config['COMPRESS_ALGORITHM'] if request.accept_encodings[e]), None)
+    if encoding is None:
+        return response
+    if response.status_code == 304:
+        # Caches copy a 304's headers onto their stored (compressed) body
+        _weaken_etag(response)
+        return response
+    
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    response.set_data(_compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+# Rendered HTML of pages that depend on neither the config nor the request
+# (beyond their own endpoint), keyed by template name. Pages that show the
+# config live in _config_pages, which is dropped whenever the config changes.
+_static_pages = {}
+_config_pages = {}
+app.config['STATIC_PAGE_MAX_AGE'] = int(os.environ.get('STATIC_PAGE_MAX_AGE', 60))
+
+
+def render_static_page(template_name, with_config=False):
+    """Serve a page rendered once per process, with ETag-based conditional GET."""
+    pages = _config_pages if with_config else _static_pages
+    page = pages.get(template_name)
+    if page is None:
+        context = {'config': config} if with_config else {}
+        body = render_template(template_name, **context).encode('utf-8')
+        page = pages[template_name] = (body, hashlib.sha1(body).hexdigest())
+    
+    body, etag = page
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    if with_config:
+        # The workspace can be switched at runtime, so always revalidate
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['STATIC_PAGE_MAX_AGE']
+    return response.make_conditional(request)
+
+
+def _json_body():
+    """Parse the request body with orjson; an empty, malformed or non-object body gives {}."""
+    try:
+        data = orjson.loads(request.get_data(cache=False) or b'{}')
+    except orjson.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+# Options for payloads that carry non-str keys, numpy values or other objects.
+_DUMPS_FULL_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps_fast(payload):
+    """Serialize a plain str-keyed payload without any orjson options."""
+    return orjson.dumps(payload)
+
+
+def _dumps_full(payload):
+    """Serialize any payload, stringifying types orjson does not know."""
+    return orjson.dumps(payload, default=str, option=_DUMPS_FULL_OPTIONS)
+
+
+def ojson(payload, status=200):
+    """Build a JSON response serialized with orjson."""
+    try:
+        body = _dumps_fast(payload)
+    except orjson.JSONEncodeError:
+        body = _dumps_full(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def _ok(text):
+    """Build a ``{"success": true, "output": ...}`` response without an outer dict."""
+    return Response(
+        b'{"success":true,"output":' + orjson.dumps(text) + b'}',
+        mimetype='application/json'
+    )
+
+
+def _err(message, status=200):
+    """Build a ``{"success": false, "error": ...}`` response without an outer dict."""
+    return Response(
+        b'{"success":false,"error":' + orjson.dumps(message) + b'}',
+        status=status,
+        mimetype='application/json'
+    )
+
+
+# Validation failures are fixed strings, so their bodies are serialized once.
+ERR_NO_BRANCH_NAME = orjson.dumps({'success': False, 'error': 'Branch name is required'})
+ERR_NO_CODE_DESCRIPTION = orjson.dumps({'success': False, 'error': 'Code description is required'})
+ERR_NO_CODE = orjson.dumps({'success': False, 'error': 'Code is required'})
+ERR_NO_COMMIT_MESSAGE = orjson.dumps({'success': False, 'error': 'Commit message is required'})
+ERR_NO_IDENTIFIER = orjson.dumps({'success': False, 'error': 'Identifier is required'})
+ERR_NO_QUESTION = orjson.dumps({'success': False, 'error': 'Question is required'})
+ERR_NO_SEARCH_QUERY = orjson.dumps({'success': False, 'error': 'Search query is required'})
+ERR_NO_WORKSPACE_PATH = orjson.dumps({'success': False, 'error': 'Workspace path is required'})
+ERR_INVALID_DIRECTORY = orjson.dumps({'success': False, 'error': 'Invalid directory'})
+ERR_INVALID_DIRECTORY_PATH = orjson.dumps({'success': False, 'error': 'Invalid directory path'})
+ERR_INVALID_WORKSPACE_PATH = orjson.dumps({'success': False, 'error': 'Invalid workspace path'})
+ERR_PROJECT_PATH_MISSING = orjson.dumps({'success': False, 'error': 'Project path does not exist'})
+ERR_PERMISSION_DENIED = orjson.dumps({'success': False, 'error': 'Permission denied to access directory'})
+ERR_CHAT_TIMEOUT = orjson.dumps({'success': False, 'error': 'Request timed out. The operation is taking longer than expected. Please try a simpler question or check the agent status.'})
+ERR_COMPONENT_INIT_FAILED = orjson.dumps({'success': False, 'error': 'Failed to initialize some components. Check logs for details.'})
+
+
+def _bad_request(body, status=400):
+    """Return one of the pre-serialized ``ERR_*`` bodies."""
+    return Response(body, status=status, mimetype='application/json')
+
+
+# Pre-serialized 503 bodies for endpoints whose backend component is missing.
+_COMPONENT_UNAVAILABLE = {
+    name: orjson.dumps({'success': False, 'error': f'{label} not initialized'})
+    for name, label in (
+        ('git_tools', 'Git tools'),
+        ('rag_system', 'RAG system'),
+        ('llm_client', 'LLM client'),
+        ('coder_agent', 'Coder agent'),
+    )
+}
+
+
+def requires(component):
+    """Short-circuit a view with a 503 when the named global component is not set."""
+    body = _COMPONENT_UNAVAILABLE[component]
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not globals()[component]:
+                web_ui_logger.error(f"{func.__name__} called but {component} is not initialized")
+                return Response(body, status=503, mimetype='application/json')
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def tool_route(logger, action, component):
+    """Wrap a backend view: 503 without ``component``, text results as tool output, errors reported.
+    
+    The view returns either the tool's output string or a ready ``Response``;
+    an exception is logged as "<action> failed" and returned as the error.
+    """
+    body = _COMPONENT_UNAVAILABLE[component]
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not globals()[component]:
+                web_ui_logger.error(f"{func.__name__} called but {component} is not initialized")
+                return Response(body, status=503, mimetype='application/json')
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                logger.exception(f"{action} failed: {e}")
+                return _err(str(e))
+            return _ok(result) if isinstance(result, str) else result
+        return wrapper
+    return decorator
+
+
+# Single event loop shared by every request; backend coroutines are submitted
+# to it instead of spinning up a thread and a fresh loop per call.
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """Return the shared background event loop, starting it on first use."""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop.is_closed():
+            try:
+                import uvloop
+                _event_loop = uvloop.new_event_loop()
+            except ImportError:
+                _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name='web-ui-event-loop', daemon=True).start()
+            app.config['LOOP'] = _event_loop
+            web_ui_logger.info(f"Started shared event loop: {type(_event_loop).__name__}")
+    return _event_loop
+
+
+@atexit.register
+def shutdown_event_loop():
+    """Close backend clients on the shared loop and stop it at interpreter exit."""
+    app.config['GIT_POOL'].shutdown(wait=False, cancel_futures=True)
+    app.config['FS_POOL'].shutdown(wait=False, cancel_futures=True)
+    for worker_loop in _git_worker_loops:
+        if not worker_loop.is_running():
+            worker_loop.close()
+    loop = _event_loop
+    if loop is None or loop.is_closed() or not loop.is_running():
+        return
+    for client in (llm_client, rag_system):
+        if client is None:
+            continue
+        try:
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+        except Exception:
+            pass
+    loop.call_soon_threadsafe(loop.stop)
+
+
+# GitTools coroutines do blocking GitPython/subprocess work, so they run on a
+# bounded pool of worker threads (each with its own long-lived event loop)
+# rather than stalling the shared loop.
+app.config['GIT_POOL'] = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='web-ui-git')
+# Filesystem probes that benefit from overlapping on a cold page cache (the
+# directory picker's per-subdirectory project checks)
+app.config['FS_POOL'] = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='web-ui-fs')
+FS_PARALLEL_MIN = 4
+GIT_WRITE_TOOLS = frozenset({'git_add', 'git_commit', 'git_create_branch', 'git_checkout', 'git_push', 'git_pull'})
+GIT_READ_CONCURRENCY = 2
+_git_semaphores = {}
+_git_worker_state = threading.local()
+
+
+_git_worker_loops = []
+
+
+def _run_on_worker_loop(coro):
+    """Run a coroutine to completion on the calling worker thread's own loop."""
+    loop = getattr(_git_worker_state, 'loop', None)
+    if loop is None:
+        loop = _git_worker_state.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        _git_worker_loops.append(loop)
+    return loop.run_until_complete(coro)
+
+
+async def run_git_tool(name, arguments):
+    """Execute a git tool on the git worker pool.
+    
+    Mutating tools share one slot so they never race on the repository index;
+    read-only tools allow a few concurrent calls each.
+    """
+    key = 'write' if name in GIT_WRITE_TOOLS else name
+    semaphore = _git_semaphores.get(key)
+    if semaphore is None:
+        semaphore = _git_semaphores[key] = asyncio.Semaphore(1 if key == 'write' else GIT_READ_CONCURRENCY)
+    
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            app.config['GIT_POOL'], _run_on_worker_loop, git_tools.execute_git_tool(name, arguments)
+        )
         try:
-            result = loop.run_until_complete(coro)
-            web_ui_logger.debug(f"Async operation completed successfully in thread {thread_id}")
-            return result
-        except Exception as e:
-            web_ui_logger.exception(f"Async operation failed in thread {thread_id}")
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted; hold the slot until it
+            # finishes so a timed-out write never overlaps the next one.
+            await asyncio.wait({future})
             raise
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
-            web_ui_logger.debug(f"Event loop closed for thread {thread_id}")
-    
-    # Always run in a separate thread to avoid event loop conflicts
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(_run_in_thread)
+
+
+# Shared read-only arguments for tools that take none
+EMPTY_ARGS = MappingProxyType({})
+
+
+def _first_text(result, default='No output'):
+    """Return the text of the first content item of a tool result."""
+    return result[0].text if result else default
+
+
+async def git_call(name, arguments):
+    """Run a git tool and return its text output."""
+    return _first_text(await run_git_tool(name, arguments))
+
+
+# Concurrency caps on the shared loop: one for everything submitted through
+# run_async, and one per backend so a slow LLM cannot use up the slots RAG
+# searches need (git has its own limits above).
+MAX_CONCURRENCY = int(os.environ.get('ASSISTANT_MAX_CONCURRENCY', '32'))
+BACKEND_CONCURRENCY = {
+    'llm': int(os.environ.get('ASSISTANT_LLM_CONCURRENCY', '8')),
+    'rag': int(os.environ.get('ASSISTANT_RAG_CONCURRENCY', '16')),
+}
+_loop_semaphores = {}
+
+
+def _loop_semaphore(key):
+    """Return the semaphore for ``key``, creating it on first use (on the shared loop)."""
+    semaphore = _loop_semaphores.get(key)
+    if semaphore is None:
+        limit = MAX_CONCURRENCY if key == 'total' else BACKEND_CONCURRENCY[key]
+        semaphore = _loop_semaphores[key] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def _gated(coro):
+    """Await ``coro`` once a slot of the overall concurrency cap is free."""
+    try:
+        async with _loop_semaphore('total'):
+            return await coro
+    finally:
+        # Cancelled while queued: close the coroutine so it is not left unawaited
+        coro.close()
+
+
+async def rag_call(name, arguments, default='No output'):
+    """Run a RAG tool and return its text output."""
+    async with _loop_semaphore('rag'):
+        return _first_text(await rag_system.execute_rag_tool(name, arguments), default)
+
+
+async def llm_call(name, arguments):
+    """Run an LLM tool and return its text output."""
+    async with _loop_semaphore('llm'):
+        return _first_text(await llm_client.execute_llm_tool(name, arguments))
+
+
+# Identical requests that arrive while one is already running share its result
+# instead of each embedding/generating again. Only touched from the shared loop.
+_inflight = {}
+
+
+async def single_flight(name, arguments, factory):
+    """Await ``factory()`` once per distinct (name, arguments) currently in flight."""
+    key = (name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(factory())
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        web_ui_logger.debug(f"Joining in-flight {name} call")
+    # Shield so one caller timing out does not cancel the call for the others
+    return await asyncio.shield(task)
+
+
+# Deadlines (seconds) for run_async by kind of operation. On expiry the
+# coroutine is cancelled, which aborts any HTTP call it is awaiting.
+DEFAULT_ASYNC_TIMEOUT = 300
+GIT_TIMEOUT = 30
+RAG_SEARCH_TIMEOUT = 60
+RAG_INDEX_TIMEOUT = 1800
+CONTEXT_TIMEOUT = 30
+STATUS_TIMEOUT = 30
+
+
+@log_function_calls(web_ui_logger)
+def run_async(coro, timeout=DEFAULT_ASYNC_TIMEOUT):
+    """Run a coroutine on the shared event loop and wait for its result.
+    
+    ``timeout=None`` waits indefinitely (one-off setup such as loading the
+    embedding model and indexing the project). Time spent waiting for a
+    ``MAX_CONCURRENCY`` slot counts towards the timeout.
+    """
+    web_ui_logger.debug(f"Starting async operation: {type(coro).__name__}")
+    future = asyncio.run_coroutine_threadsafe(_gated(coro), get_event_loop())
+    try:
+        result = future.result(timeout=timeout)
+        web_ui_logger.debug("Async operation completed within timeout")
+        return result
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        web_ui_logger.error(f"Async operation timed out after {timeout} seconds")
+        raise
+    except Exception as e:
+        web_ui_logger.exception("Async operation failed with exception")
+        raise
+
+
+def iterate_async(agen, timeout=300):
+    """Iterate an async generator on the shared event loop from synchronous code."""
+    loop = get_event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result(timeout=timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result(timeout=5)
+
+
+def sse_response(agen):
+    """Stream text chunks from an async generator as Server-Sent Events.
+    
+    Each text chunk is sent as ``data: {"t": ...}`` and dict items are sent
+    as-is; the stream ends with ``data: {"done": true}`` or ``data: {"error": ...}``.
+    """
+    def generate():
         try:
-            result = future.result(timeout=300)  # 5 minute timeout for complex operations
-            web_ui_logger.debug("Async operation completed within timeout")
-            return result
-        except concurrent.futures.TimeoutError:
-            web_ui_logger.error("Async operation timed out after 300 seconds")
-            raise
+            for chunk in iterate_async(agen):
+                if isinstance(chunk, dict):
+                    yield b'data: ' + _dumps_full(chunk) + b'\n\n'
+                else:
+                    yield b'data: ' + orjson.dumps({'t': chunk}) + b'\n\n'
+            yield b'data: {"done":true}\n\n'
         except Exception as e:
-            web_ui_logger.exception("Async operation failed with exception")
-            raise
+            llm_logger.exception(f"Streaming response failed: {e}")
+            yield b'data: ' + orjson.dumps({'error': str(e)}) + b'\n\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @log_function_calls(web_ui_logger)
@@ -114,14 +788,24 @@ def init_components():
     
     web_ui_logger.info("Starting component initialization")
     
+    # Start the shared loop up front so component setup runs on the same loop
+    # that later serves requests and keeps their connections warm.
+    get_event_loop()
+    
+    invalidate_config_json()
+    
     try:
+        get_config.cache_clear()
         config = get_config()
         web_ui_logger.debug(f"Configuration loaded: workspace_path={config.workspace_path}")
         
         # Only initialize if workspace is configured
         if config.workspace_path and os.path.exists(config.workspace_path):
             web_ui_logger.info(f"Initializing components for workspace: {config.workspace_path}")
-            return reinitialize_components(config.workspace_path)
+            initialized = reinitialize_components(config.workspace_path, eager=False)
+            if initialized and os.environ.get('RAG_WARMUP', '0') != '0':
+                threading.Thread(target=warm_rag_cache, name='web-ui-rag-warmup', daemon=True).start()
+            return initialized
         else:
             web_ui_logger.warning("No workspace configured. Skipping component initialization.")
             return True
@@ -153,7 +837,7 @@ def init_components():
 def index():
     """Main dashboard page."""
     web_ui_logger.debug("Accessing main dashboard page")
-    return render_template('index.html', config=config)
+    return render_static_page('index.html', with_config=True)
 
 
 @app.route('/api/config')
@@ -163,17 +847,32 @@ def get_config_api():
     web_ui_logger.debug("Getting configuration via API")
     if not config:
         web_ui_logger.error("Configuration not loaded")
-        return jsonify({'error': 'Configuration not loaded'}), 500
-    
-    config_data = {
-        'workspace_path': config.workspace_path,
-        'llm_model': config.llm.model,
-        'llm_base_url': config.llm.base_url,
-        'rag_db_path': config.rag.db_path,
-        'log_level': config.log_level
-    }
-    web_ui_logger.debug(f"Returning configuration: {config_data}")
-    return jsonify(config_data)
+        return ojson({'error': 'Configuration not loaded'}, status=500)
+    
+    cached = app.config.get('CONFIG_JSON')
+    if cached is None:
+        config_data = {
+            'workspace_path': config.workspace_path,
+            'llm_model': config.llm.model,
+            'llm_base_url': config.llm.base_url,
+            'rag_db_path': config.rag.db_path,
+            'log_level': config.log_level
+        }
+        web_ui_logger.debug(f"Caching configuration: {config_data}")
+        config_json = orjson.dumps(config_data)
+        cached = app.config['CONFIG_JSON'] = (config_json, hashlib.sha1(config_json).hexdigest())
+    
+    config_json, etag = cached
+    response = Response(config_json, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def invalidate_config_json():
+    """Drop the serialized /api/config payload and config pages after the configuration changes."""
+    app.config.pop('CONFIG_JSON', None)
+    _config_pages.clear()
 
 
 @app.route('/git')
@@ -181,150 +880,117 @@ def get_config_api():
 def git_page():
     """Git operations page."""
     web_ui_logger.debug("Accessing git operations page")
-    return render_template('git.html')
+    return render_static_page('git.html')
 
 
 @app.route('/api/git/status')
 @log_function_calls(web_ui_logger)
+@tool_route(web_ui_logger, 'Git status', 'git_tools')
 def git_status():
     """Get Git repository status."""
     web_ui_logger.debug("Getting git status")
-    try:
-        if not git_tools:
-            web_ui_logger.warning("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-        result = run_async(git_tools.execute_git_tool('git_status', {}))
-        web_ui_logger.debug(f"Git status result: {len(result[0].text) if result else 0} chars")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        web_ui_logger.exception(f"Git status failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    output = run_async(git_call('git_status', EMPTY_ARGS), timeout=GIT_TIMEOUT)
+    web_ui_logger.debug("Git status result: %d chars", len(output))
+    return output
 
 
 @app.route('/api/git/add', methods=['POST'])
 @log_function_calls(git_logger)
+@tool_route(git_logger, 'Git add', 'git_tools')
 def git_add():
     """Add files to Git staging area."""
-    try:
-        data = request.get_json()
-        files = data.get('files', [])
-        git_logger.debug(f"Adding files to Git: {files}")
-        
-        if not git_tools:
-            git_logger.error("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-            
-        result = run_async(git_tools.execute_git_tool('git_add', {'files': files}))
-        git_logger.info(f"Git add completed for {len(files)} files")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        git_logger.exception(f"Git add failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    files = data.get('files', [])
+    git_logger.debug("Adding files to Git: %s", files)
+    
+    output = run_async(git_call('git_add', {'files': files}), timeout=GIT_TIMEOUT)
+    git_logger.info(f"Git add completed for {len(files)} files")
+    return output
 
 
 @app.route('/api/git/commit', methods=['POST'])
 @log_function_calls(git_logger)
+@tool_route(git_logger, 'Git commit', 'git_tools')
 def git_commit():
     """Commit staged changes."""
-    try:
-        if not git_tools:
-            git_logger.error("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-            
-        data = request.get_json()
-        message = data.get('message', '')
-        add_all = data.get('add_all', False)
-        
-        git_logger.debug(f"Git commit requested: message='{message}', add_all={add_all}")
-        
-        if not message:
-            git_logger.warning("Commit attempted without message")
-            return jsonify({'success': False, 'error': 'Commit message is required'})
-        
-        result = run_async(git_tools.execute_git_tool('git_commit', {
-            'message': message,
-            'add_all': add_all
-        }))
-        git_logger.info(f"Git commit completed: '{message}'")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        git_logger.exception(f"Git commit failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    message = data.get('message', '')
+    add_all = data.get('add_all', False)
+    
+    git_logger.debug("Git commit requested: message='%s', add_all=%s", message, add_all)
+    
+    if not message:
+        git_logger.warning("Commit attempted without message")
+        return _bad_request(ERR_NO_COMMIT_MESSAGE)
+    
+    output = run_async(git_call('git_commit', {
+        'message': message,
+        'add_all': add_all
+    }), timeout=GIT_TIMEOUT)
+    git_logger.info(f"Git commit completed: '{message}'")
+    return output
 
 
 @app.route('/api/git/branches')
 @log_function_calls(git_logger)
+@tool_route(git_logger, 'Git branches listing', 'git_tools')
 def git_branches():
     """List Git branches."""
-    try:
-        if not git_tools:
-            git_logger.error("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-            
-        result = run_async(git_tools.execute_git_tool('git_branch_list', {}))
-        git_logger.debug(f"Listed Git branches: {len(result[0].text) if result else 0} chars")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        git_logger.exception(f"Git branches listing failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    cached = git_branches_cache.get('branches')
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
+    output = run_async(git_call('git_branch_list', EMPTY_ARGS), timeout=GIT_TIMEOUT)
+    git_logger.debug("Listed Git branches: %d chars", len(output))
+    body = orjson.dumps({'success': True, 'output': output})
+    git_branches_cache.set('branches', body)
+    return Response(body, mimetype='application/json')
 
 
 @app.route('/api/git/create_branch', methods=['POST'])
 @log_function_calls(git_logger)
+@tool_route(git_logger, 'Git branch creation', 'git_tools')
 def git_create_branch():
     """Create a new Git branch."""
-    try:
-        if not git_tools:
-            git_logger.error("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-            
-        data = request.get_json()
-        branch_name = data.get('branch_name', '')
-        checkout = data.get('checkout', True)
-        
-        git_logger.debug(f"Creating Git branch: {branch_name}, checkout={checkout}")
-        
-        if not branch_name:
-            git_logger.warning("Branch creation attempted without name")
-            return jsonify({'success': False, 'error': 'Branch name is required'})
-        
-        result = run_async(git_tools.execute_git_tool('git_create_branch', {
-            'branch_name': branch_name,
-            'checkout': checkout
-        }))
-        git_logger.info(f"Git branch created: {branch_name}")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        git_logger.exception(f"Git branch creation failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    branch_name = data.get('branch_name', '')
+    checkout = data.get('checkout', True)
+    
+    git_logger.debug("Creating Git branch: %s, checkout=%s", branch_name, checkout)
+    
+    if not branch_name:
+        git_logger.warning("Branch creation attempted without name")
+        return _bad_request(ERR_NO_BRANCH_NAME)
+    
+    output = run_async(git_call('git_create_branch', {
+        'branch_name': branch_name,
+        'checkout': checkout
+    }), timeout=GIT_TIMEOUT)
+    git_branches_cache.clear()
+    git_logger.info(f"Git branch created: {branch_name}")
+    return output
 
 
 @app.route('/api/git/checkout', methods=['POST'])
 @log_function_calls(git_logger)
+@tool_route(git_logger, 'Git checkout', 'git_tools')
 def git_checkout():
     """Switch to a different branch."""
-    try:
-        if not git_tools:
-            git_logger.error("Git tools not initialized")
-            return jsonify({'success': False, 'error': 'Git tools not initialized'})
-            
-        data = request.get_json()
-        branch_name = data.get('branch_name', '')
-        
-        git_logger.debug(f"Checking out Git branch: {branch_name}")
-        
-        if not branch_name:
-            git_logger.warning("Branch checkout attempted without name")
-            return jsonify({'success': False, 'error': 'Branch name is required'})
-        
-        result = run_async(git_tools.execute_git_tool('git_checkout', {
-            'branch_name': branch_name
-        }))
-        git_logger.info(f"Git branch checked out: {branch_name}")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        git_logger.exception(f"Git checkout failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    branch_name = data.get('branch_name', '')
+    
+    git_logger.debug("Checking out Git branch: %s", branch_name)
+    
+    if not branch_name:
+        git_logger.warning("Branch checkout attempted without name")
+        return _bad_request(ERR_NO_BRANCH_NAME)
+    
+    output = run_async(git_call('git_checkout', {
+        'branch_name': branch_name
+    }), timeout=GIT_TIMEOUT)
+    git_branches_cache.clear()
+    git_logger.info(f"Git branch checked out: {branch_name}")
+    return output
 
 
 @app.route('/rag')
@@ -332,153 +998,163 @@ def git_checkout():
 def rag_page():
     """RAG system page."""
     web_ui_logger.debug("Accessing RAG operations page")
-    return render_template('rag.html')
+    return render_static_page('rag.html')
 
 
 @app.route('/api/rag/index', methods=['POST'])
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'RAG indexing', 'rag_system')
 def rag_index():
     """Index the codebase for RAG."""
-    try:
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-            
-        data = request.get_json()
-        directory = data.get('directory', '.')
-        force_reindex = data.get('force_reindex', False)
-        
-        rag_logger.debug(f"RAG indexing requested: directory={directory}, force_reindex={force_reindex}")
-        
-        result = run_async(rag_system.execute_rag_tool('index_codebase', {
-            'directory': directory,
-            'force_reindex': force_reindex
-        }))
-        rag_logger.info(f"RAG indexing completed for directory: {directory}")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        rag_logger.exception(f"RAG indexing failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    directory = data.get('directory', '.')
+    force_reindex = data.get('force_reindex', False)
+    
+    rag_logger.debug("RAG indexing requested: directory=%s, force_reindex=%s", directory, force_reindex)
+    
+    output = run_async(rag_call('index_codebase', {
+        'directory': directory,
+        'force_reindex': force_reindex
+    }), timeout=RAG_INDEX_TIMEOUT)
+    clear_rag_caches()
+    rag_logger.info(f"RAG indexing completed for directory: {directory}")
+    return output
 
 
 @app.route('/api/rag/search', methods=['POST'])
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'RAG search', 'rag_system')
 def rag_search():
     """Search the indexed codebase."""
-    try:
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-            
-        data = request.get_json()
-        query = data.get('query', '')
-        limit = data.get('limit', 5)
-        
-        rag_logger.debug(f"RAG search requested: query='{query}', limit={limit}")
-        
-        if not query:
-            rag_logger.warning("RAG search attempted without query")
-            return jsonify({'success': False, 'error': 'Search query is required'})
-        
-        # Use lower default threshold based on comprehensive test results
-        result = run_async(rag_system.execute_rag_tool('search_code', {
-            'query': query,
-            'limit': limit,
-            'similarity_threshold': data.get('similarity_threshold', 0.3),
-            'filter_language': data.get('filter_language'),
-            'filter_type': data.get('filter_type')
-        }))
-        
-        rag_logger.info(f"RAG search completed for query: '{query[:50]}...'")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        rag_logger.exception(f"RAG search failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    query = data.get('query', '')
+    limit = data.get('limit', 5)
+    
+    rag_logger.debug("RAG search requested: query='%s', limit=%s", query, limit)
+    
+    if not query:
+        rag_logger.warning("RAG search attempted without query")
+        return _bad_request(ERR_NO_SEARCH_QUERY)
+    
+    # Use lower default threshold based on comprehensive test results
+    search_params = {
+        'query': query,
+        'limit': limit,
+        'similarity_threshold': data.get('similarity_threshold', 0.3),
+        'filter_language': data.get('filter_language'),
+        'filter_type': data.get('filter_type')
+    }
+    body = search_response_body(search_params)
+    rag_logger.info(f"RAG search completed for query: '{query[:50]}...'")
+    return Response(body, mimetype='application/json')
+
+
+def search_response_body(search_params):
+    """Serialized /api/rag/search response for ``search_params``, via the search cache."""
+    cache_key = rag_cache_key('search', search_params)
+    cached = rag_search_cache.get(cache_key)
+    if cached is not None:
+        rag_logger.debug("RAG search cache hit for query: '%s'", search_params['query'][:50])
+        return cached
+    
+    output = run_async(single_flight(
+        'search_code', search_params, lambda: rag_call('search_code', search_params)
+    ), timeout=RAG_SEARCH_TIMEOUT)
+    
+    body = orjson.dumps({'success': True, 'output': output})
+    if not output.startswith(RAG_FAILURE_PREFIXES):
+        rag_search_cache.set(cache_key, body)
+    return body
 
 
 @app.route('/api/rag/search/advanced', methods=['POST'])
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'Advanced RAG search', 'rag_system')
 def rag_search_advanced():
     """Advanced search with analytics and filtering."""
-    try:
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-            
-        data = request.get_json()
-        query = data.get('query', '')
-        limit = data.get('limit', 10)
-        similarity_threshold = data.get('similarity_threshold', 0.3)
-        filter_language = data.get('filter_language')
-        filter_type = data.get('filter_type')
-        
-        rag_logger.debug(f"Advanced RAG search: query='{query}', limit={limit}, threshold={similarity_threshold}")
-        
-        if not query:
-            rag_logger.warning("Advanced RAG search attempted without query")
-            return jsonify({'success': False, 'error': 'Search query is required'})
-        
-        # Prepare search parameters
-        search_params = {
-            'query': query,
-            'limit': limit,
-            'similarity_threshold': similarity_threshold
-        }
-        
-        # Add filters if specified
-        if filter_language:
-            search_params['filter_language'] = filter_language
-            rag_logger.debug(f"Language filter applied: {filter_language}")
-        if filter_type:
-            search_params['filter_type'] = filter_type
-            rag_logger.debug(f"Type filter applied: {filter_type}")
-        
-        # Execute search
-        result = run_async(rag_system.execute_rag_tool('search_code', search_params))
+    data = _json_body()
+    query = data.get('query', '')
+    limit = data.get('limit', 10)
+    similarity_threshold = data.get('similarity_threshold', 0.3)
+    filter_language = data.get('filter_language')
+    filter_type = data.get('filter_type')
+    
+    rag_logger.debug("Advanced RAG search: query='%s', limit=%s, threshold=%s", query, limit, similarity_threshold)
+    
+    if not query:
+        rag_logger.warning("Advanced RAG search attempted without query")
+        return _bad_request(ERR_NO_SEARCH_QUERY)
+    
+    # Prepare search parameters
+    search_params = {
+        'query': query,
+        'limit': limit,
+        'similarity_threshold': similarity_threshold
+    }
+    
+    # Add filters if specified
+    if filter_language:
+        search_params['filter_language'] = filter_language
+        rag_logger.debug("Language filter applied: %s", filter_language)
+    if filter_type:
+        search_params['filter_type'] = filter_type
+        rag_logger.debug("Type filter applied: %s", filter_type)
+    
+    cache_key = rag_cache_key('advanced', search_params)
+    cached = rag_search_cache.get(cache_key)
+    if cached is not None:
+        rag_logger.debug("Advanced RAG search cache hit for query: '%s'", query[:50])
+        return Response(cached, mimetype='application/json')
+    
+    # Execute search, keeping the structured hits for the analytics
+    output, hits = run_async(single_flight(
+        'search_code_hits', search_params, lambda: rag_system.search_code_hits(**search_params)
+    ), timeout=RAG_SEARCH_TIMEOUT)
+    
+    if output:
+        analytics = extract_search_analytics([hit['similarity'] for hit in hits])
+        rag_logger.info(f"Advanced RAG search completed: {analytics.get('result_count', 0)} results")
+        
+        body = _dumps_fast({
+            'success': True, 
+            'output': output,
+            'analytics': analytics,
+            'search_params': search_params
+        })
+        if not output.startswith(RAG_FAILURE_PREFIXES):
+            rag_search_cache.set(cache_key, body)
+        return Response(body, mimetype='application/json')
+    else:
+        rag_logger.warning("Advanced RAG search returned no results")
+        return _ok('No results found')
         
-        if result and result[0]:
-            output = result[0].text
-            
-            # Extract analytics
-            analytics = extract_search_analytics(output, query, similarity_threshold)
-            rag_logger.info(f"Advanced RAG search completed: {analytics.get('result_count', 0)} results")
-            
-            return jsonify({
-                'success': True, 
-                'output': output,
-                'analytics': analytics,
-                'search_params': search_params
-            })
-        else:
-            rag_logger.warning("Advanced RAG search returned no results")
-            return jsonify({'success': True, 'output': 'No results found'})
-            
-    except Exception as e:
-        rag_logger.exception(f"Advanced RAG search failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
 
-def extract_search_analytics(output, query, threshold):
-    """Extract analytics from search output."""
-    import re
-    
+# Recommendations by search outcome, based on the RAG test insights
+RECOMMEND_NO_RESULTS = (
+    'Try lowering similarity threshold to 0.2-0.3',
+    'Use broader search terms',
+    'Remove language/type filters',
+    'Consider using search templates'
+)
+RECOMMEND_BROAD = (
+    'Consider raising similarity threshold for more precise results',
+    'Add language or type filters to narrow results'
+)
+RECOMMEND_EXCELLENT = ('Great results! Consider similar queries for related code',)
+
+
+def extract_search_analytics(similarities):
+    """Summarize the similarity scores of a search's hits."""
     analytics = {
-        'result_count': 0,
+        'result_count': len(similarities),
         'avg_similarity': 0.0,
         'similarity_range': [0.0, 0.0],
         'quality_score': 'unknown',
-        'recommendations': []
+        'recommendations': ()
     }
     
     try:
-        # Extract result count
-        result_match = re.search(r'Found (\d+) relevant code snippets', output)
-        if result_match:
-            analytics['result_count'] = int(result_match.group(1))
-        
-        # Extract similarity scores
-        similarity_matches = re.findall(r'similarity: ([\d.]+)\)', output)
-        if similarity_matches:
-            similarities = [float(s) for s in similarity_matches]
+        if similarities:
             analytics['avg_similarity'] = sum(similarities) / len(similarities)
             analytics['similarity_range'] = [min(similarities), max(similarities)]
             
@@ -494,21 +1170,11 @@ def extract_search_analytics(output, query, threshold):
         
         # Generate recommendations based on test insights
         if analytics['result_count'] == 0:
-            analytics['recommendations'] = [
-                'Try lowering similarity threshold to 0.2-0.3',
-                'Use broader search terms',
-                'Remove language/type filters',
-                'Consider using search templates'
-            ]
+            analytics['recommendations'] = RECOMMEND_NO_RESULTS
         elif analytics['quality_score'] == 'broad':
-            analytics['recommendations'] = [
-                'Consider raising similarity threshold for more precise results',
-                'Add language or type filters to narrow results'
-            ]
+            analytics['recommendations'] = RECOMMEND_BROAD
         elif analytics['quality_score'] == 'excellent':
-            analytics['recommendations'] = [
-                'Great results! Consider similar queries for related code'
-            ]
+            analytics['recommendations'] = RECOMMEND_EXCELLENT
         
     except Exception as e:
         analytics['error'] = str(e)
@@ -518,71 +1184,61 @@ def extract_search_analytics(output, query, threshold):
 
 @app.route('/api/rag/status')
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'RAG status check', 'rag_system')
 def rag_status():
     """Get RAG system status."""
-    try:
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-            
-        result = run_async(rag_system.execute_rag_tool('rag_status', {}))
-        rag_logger.debug("RAG status retrieved successfully")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        rag_logger.exception(f"RAG status check failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    output = run_async(rag_call('rag_status', EMPTY_ARGS), timeout=STATUS_TIMEOUT)
+    rag_logger.debug("RAG status retrieved successfully")
+    return output
 
 
 @app.route('/api/rag/clear', methods=['POST'])
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'RAG clear', 'rag_system')
 def rag_clear():
     """Clear the RAG index."""
-    try:
-        data = request.get_json()
-        confirm = data.get('confirm', False)
-        
-        rag_logger.debug(f"RAG clear requested: confirm={confirm}")
-        
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-        
-        result = run_async(rag_system.execute_rag_tool('clear_index', {'confirm': confirm}))
-        rag_logger.info(f"RAG index cleared: confirm={confirm}")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        rag_logger.exception(f"RAG clear failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    confirm = data.get('confirm', False)
+    
+    rag_logger.debug("RAG clear requested: confirm=%s", confirm)
+    
+    output = run_async(rag_call('clear_index', {'confirm': confirm}))
+    clear_rag_caches()
+    rag_logger.info(f"RAG index cleared: confirm={confirm}")
+    return output
 
 
 @app.route('/api/rag/context', methods=['POST'])
 @log_function_calls(rag_logger)
+@tool_route(rag_logger, 'RAG context retrieval', 'rag_system')
 def rag_context():
     """Get context for a specific function or class."""
-    try:
-        if not rag_system:
-            rag_logger.error("RAG system not initialized")
-            return jsonify({'success': False, 'error': 'RAG system not initialized'})
-            
-        data = request.get_json()
-        identifier = data.get('identifier', '')
-        include_related = data.get('include_related', True)
-        
-        rag_logger.debug(f"RAG context requested: identifier='{identifier}', include_related={include_related}")
-        
-        if not identifier:
-            rag_logger.warning("RAG context attempted without identifier")
-            return jsonify({'success': False, 'error': 'Identifier is required'})
-        
-        result = run_async(rag_system.execute_rag_tool('get_context', {
-            'identifier': identifier,
-            'include_related': include_related
-        }))
-        rag_logger.info(f"RAG context retrieved for: '{identifier}'")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        rag_logger.exception(f"RAG context retrieval failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    identifier = data.get('identifier', '')
+    include_related = data.get('include_related', True)
+    
+    rag_logger.debug("RAG context requested: identifier='%s', include_related=%s", identifier, include_related)
+    
+    if not identifier:
+        rag_logger.warning("RAG context attempted without identifier")
+        return _bad_request(ERR_NO_IDENTIFIER)
+    
+    context_params = {
+        'identifier': identifier,
+        'include_related': include_related
+    }
+    cache_key = rag_cache_key('context', context_params)
+    cached = rag_context_cache.get(cache_key)
+    if cached is not None:
+        rag_logger.debug("RAG context cache hit for: '%s'", identifier)
+        return Response(cached, mimetype='application/json')
+    
+    output = run_async(rag_call('get_context', context_params), timeout=RAG_SEARCH_TIMEOUT)
+    response = _ok(output)
+    if not output.startswith(RAG_FAILURE_PREFIXES):
+        rag_context_cache.set(cache_key, response.get_data())
+    rag_logger.info(f"RAG context retrieved for: '{identifier}'")
+    return response
 
 
 @app.route('/llm')
@@ -590,103 +1246,100 @@ def rag_context():
 def llm_page():
     """LLM tools page."""
     web_ui_logger.debug("Accessing LLM tools page")
-    return render_template('llm.html')
+    return render_static_page('llm.html')
 
 
 @app.route('/api/llm/generate', methods=['POST'])
 @log_function_calls(llm_logger)
+@tool_route(llm_logger, 'LLM code generation', 'llm_client')
 def llm_generate():
     """Generate code using LLM."""
-    try:
-        if not llm_client:
-            llm_logger.error("LLM client not initialized")
-            return jsonify({'success': False, 'error': 'LLM client not initialized'})
-            
-        data = request.get_json()
-        description = data.get('description', '')
-        language = data.get('language', 'python')
-        context = data.get('context', '')
-        style = data.get('style', 'clean')
-        
-        llm_logger.debug(f"LLM code generation requested: description='{description[:50]}...', language={language}, style={style}")
-        
-        if not description:
-            llm_logger.warning("LLM code generation attempted without description")
-            return jsonify({'success': False, 'error': 'Code description is required'})
-        
-        result = run_async(llm_client.execute_llm_tool('generate_code', {
-            'description': description,
-            'language': language,
-            'context': context,
-            'style': style
-        }))
-        llm_logger.info(f"LLM code generation completed for: '{description[:50]}...'")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        llm_logger.exception(f"LLM code generation failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    description = data.get('description', '')
+    language = data.get('language', 'python')
+    context = data.get('context', '')
+    style = data.get('style', 'clean')
+    
+    llm_logger.debug("LLM code generation requested: description='%s...', language=%s, style=%s", description[:50], language, style)
+    
+    if not description:
+        llm_logger.warning("LLM code generation attempted without description")
+        return _bad_request(ERR_NO_CODE_DESCRIPTION)
+    
+    tool_args = {
+        'description': description,
+        'language': language,
+        'context': context,
+        'style': style
+    }
+    if data.get('stream'):
+        return sse_response(llm_client.stream_llm_tool('generate_code', tool_args))
+    
+    output = run_async(single_flight(
+        'generate_code', tool_args, lambda: llm_call('generate_code', tool_args)
+    ))
+    llm_logger.info(f"LLM code generation completed for: '{description[:50]}...'")
+    return output
 
 
 @app.route('/api/llm/explain', methods=['POST'])
 @log_function_calls(llm_logger)
+@tool_route(llm_logger, 'LLM code explanation', 'llm_client')
 def llm_explain():
     """Explain code using LLM."""
-    try:
-        if not llm_client:
-            llm_logger.error("LLM client not initialized")
-            return jsonify({'success': False, 'error': 'LLM client not initialized'})
-            
-        data = request.get_json()
-        code = data.get('code', '')
-        detail_level = data.get('detail_level', 'medium')
-        
-        llm_logger.debug(f"LLM code explanation requested: code_length={len(code)}, detail_level={detail_level}")
-        
-        if not code:
-            llm_logger.warning("LLM code explanation attempted without code")
-            return jsonify({'success': False, 'error': 'Code is required'})
-        
-        result = run_async(llm_client.execute_llm_tool('explain_code', {
-            'code': code,
-            'detail_level': detail_level
-        }))
-        llm_logger.info(f"LLM code explanation completed for {len(code)} chars of code")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        llm_logger.exception(f"LLM code explanation failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    code = data.get('code', '')
+    detail_level = data.get('detail_level', 'medium')
+    
+    llm_logger.debug("LLM code explanation requested: code_length=%d, detail_level=%s", len(code), detail_level)
+    
+    if not code:
+        llm_logger.warning("LLM code explanation attempted without code")
+        return _bad_request(ERR_NO_CODE)
+    
+    tool_args = {
+        'code': code,
+        'detail_level': detail_level
+    }
+    if data.get('stream'):
+        return sse_response(llm_client.stream_llm_tool('explain_code', tool_args))
+    
+    output = run_async(single_flight(
+        'explain_code', tool_args, lambda: llm_call('explain_code', tool_args)
+    ))
+    llm_logger.info(f"LLM code explanation completed for {len(code)} chars of code")
+    return output
 
 
 @app.route('/api/llm/refactor', methods=['POST'])
 @log_function_calls(llm_logger)
+@tool_route(llm_logger, 'LLM code refactoring', 'llm_client')
 def llm_refactor():
     """Refactor code using LLM."""
-    try:
-        if not llm_client:
-            llm_logger.error("LLM client not initialized")
-            return jsonify({'success': False, 'error': 'LLM client not initialized'})
-            
-        data = request.get_json()
-        code = data.get('code', '')
-        goals = data.get('goals', [])
-        language = data.get('language', 'python')
-        
-        llm_logger.debug(f"LLM code refactoring requested: code_length={len(code)}, goals={goals}, language={language}")
-        
-        if not code:
-            llm_logger.warning("LLM code refactoring attempted without code")
-            return jsonify({'success': False, 'error': 'Code is required'})
-        
-        result = run_async(llm_client.execute_llm_tool('refactor_code', {
-            'code': code,
-            'goals': goals,
-            'language': language
-        }))
-        llm_logger.info(f"LLM code refactoring completed for {len(code)} chars of code with goals: {goals}")
-        return jsonify({'success': True, 'output': result[0].text if result else 'No output'})
-    except Exception as e:
-        llm_logger.exception(f"LLM code refactoring failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+    data = _json_body()
+    code = data.get('code', '')
+    goals = data.get('goals', [])
+    language = data.get('language', 'python')
+    
+    llm_logger.debug("LLM code refactoring requested: code_length=%d, goals=%s, language=%s", len(code), goals, language)
+    
+    if not code:
+        llm_logger.warning("LLM code refactoring attempted without code")
+        return _bad_request(ERR_NO_CODE)
+    
+    tool_args = {
+        'code': code,
+        'goals': goals,
+        'language': language
+    }
+    if data.get('stream'):
+        return sse_response(llm_client.stream_llm_tool('refactor_code', tool_args))
+    
+    output = run_async(single_flight(
+        'refactor_code', tool_args, lambda: llm_call('refactor_code', tool_args)
+    ))
+    llm_logger.info(f"LLM code refactoring completed for {len(code)} chars of code with goals: {goals}")
+    return output
 
 
 # Helper functions for enhanced chat context collection
@@ -701,7 +1354,7 @@ async def _get_workspace_context():
             return None
         
         workspace_path = config.workspace_path
-        agent_logger.debug(f"Analyzing workspace at: {workspace_path}")
+        agent_logger.debug("Analyzing workspace at: %s", workspace_path)
         
         workspace_info = {
             'path': workspace_path,
@@ -709,32 +1362,22 @@ async def _get_workspace_context():
             'exists': os.path.exists(workspace_path)
         }
         
-        agent_logger.debug(f"Workspace info: name={workspace_info['name']}, exists={workspace_info['exists']}")
+        agent_logger.debug("Workspace info: name=%s, exists=%s", workspace_info['name'], workspace_info['exists'])
         
         # Get basic project info
         if os.path.exists(workspace_path):
             try:
                 agent_logger.debug("Starting file analysis in workspace")
-                # Count files by type
-                file_counts = {}
-                total_dirs = 0
-                
-                for root, dirs, files in os.walk(workspace_path):
-                    # Skip hidden and common build directories
-                    dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules', 'build', 'dist']]
-                    total_dirs += len(dirs)
-                    
-                    for file in files:
-                        if not file.startswith('.'):
-                            ext = os.path.splitext(file)[1].lower()
-                            file_counts[ext] = file_counts.get(ext, 0) + 1
+                file_counts, total_dirs, _ = await asyncio.get_running_loop().run_in_executor(
+                    None, scan_workspace, workspace_path
+                )
                 
                 workspace_info['file_counts'] = file_counts
                 workspace_info['total_files'] = sum(file_counts.values())
                 workspace_info['total_directories'] = total_dirs
                 
-                agent_logger.info(f"Workspace analysis complete: {workspace_info['total_files']} files, {total_dirs} directories")
-                agent_logger.debug(f"File types found: {list(file_counts.keys())[:10]}")  # Log first 10 extensions
+                agent_logger.info("Workspace analysis complete: %s files, %s directories", workspace_info['total_files'], total_dirs)
+                agent_logger.debug("File types found: %s", list(file_counts.keys())[:10])  # Log first 10 extensions
                 
             except Exception as e:
                 agent_logger.error(f"Failed to analyze workspace files: {e}")
@@ -747,6 +1390,70 @@ async def _get_workspace_context():
         agent_logger.exception(f"Error collecting workspace context: {e}")
         return {'error': str(e)}
 
+def scan_workspace(workspace_path):
+    """Walk ``workspace_path`` once for the workspace and project-structure context.
+    
+    Returns ``(file_counts, total_dirs, structure_info)``: files by extension
+    and the directory count, skipping hidden entries and common build
+    directories, plus the top-level directories and well-known project files.
+    Results are reused for up to 30 seconds while the root directory's mtime
+    is unchanged; concurrent callers wait for a single walk.
+    """
+    with workspace_scan_lock:
+        root_mtime = os.stat(workspace_path).st_mtime_ns
+        cached = workspace_scan_cache.get(workspace_path)
+        if cached is not None and cached[0] == root_mtime:
+            return cached[1]
+        
+        file_counts = Counter()
+        total_dirs = 0
+        top_dirs = []
+        top_files = []
+        stack = [workspace_path]
+        while stack:
+            directory = stack.pop()
+            at_root = directory == workspace_path
+            extensions = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        # DirEntry.is_dir() answers from the directory listing;
+                        # only symlinks need a stat to follow
+                        if entry.is_dir():
+                            if at_root:
+                                top_dirs.append(entry.name)
+                            if entry.name not in WORKSPACE_SKIP_DIRS:
+                                total_dirs += 1
+                                if not entry.is_symlink():
+                                    stack.append(entry.path)
+                        else:
+                            # Same result as os.path.splitext for non-hidden names
+                            name = entry.name
+                            dot = name.rfind('.')
+                            extensions.append(name[dot:].lower() if dot > 0 else '')
+                            if at_root and name.lower() in PROJECT_IMPORTANT_FILES:
+                                top_files.append(name)
+            except OSError:
+                # Like os.walk, skip directories that can't be listed or
+                # vanished during the walk
+                continue
+            file_counts.update(extensions)
+        
+        top_dirs.sort()
+        top_files.sort()
+        structure_info = {
+            'directories': top_dirs[:10],  # Limit to top 10
+            'important_files': top_files,
+            'total_dirs': len(top_dirs),
+            'workspace_path': workspace_path
+        }
+        result = (file_counts, total_dirs, structure_info)
+        workspace_scan_cache.set(workspace_path, (root_mtime, result))
+        return result
+
+
 @log_function_calls(git_logger)
 async def _get_git_context():
     """Get Git repository status."""
@@ -757,17 +1464,32 @@ async def _get_git_context():
             git_logger.warning("Git tools not available")
             return None
         
+        state_key = git_state_key(git_tools.repo_path)
+        if state_key is not None:
+            cached = git_context_cache.get(state_key)
+            if cached is not None:
+                git_logger.debug("Using cached Git context")
+                return cached
+        
         git_info = {}
         
+        # Status and branches are independent reads, so fetch them together
+        git_logger.debug("Fetching Git status and branch information")
+        status_result, branch_result = await asyncio.gather(
+            run_git_tool('git_status', EMPTY_ARGS),
+            run_git_tool('git_branch_list', EMPTY_ARGS),
+            return_exceptions=True
+        )
+        
         # Get status
         try:
-            git_logger.debug("Fetching Git status")
-            status_result = await git_tools.execute_git_tool('git_status', {})
+            if isinstance(status_result, Exception):
+                raise status_result
             if status_result and status_result[0]:
                 git_info['status'] = status_result[0].text
                 # Count lines in status for logging
-                status_lines = len(status_result[0].text.splitlines()) if status_result[0].text else 0
-                git_logger.debug(f"Git status retrieved: {status_lines} lines")
+                status_lines = status_result[0].text.count('\n') if status_result[0].text else 0
+                git_logger.debug("Git status retrieved: %s lines", status_lines)
             else:
                 git_logger.warning("Git status returned empty result")
         except Exception as e:
@@ -776,18 +1498,14 @@ async def _get_git_context():
         
         # Get current branch
         try:
-            git_logger.debug("Fetching Git branch information")
-            branch_result = await git_tools.execute_git_tool('git_branch_list', {})
+            if isinstance(branch_result, Exception):
+                raise branch_result
             if branch_result and branch_result[0]:
                 git_info['branches'] = branch_result[0].text
                 # Extract current branch for logging
-                branches_text = branch_result[0].text
-                current_branch = "unknown"
-                for line in branches_text.splitlines():
-                    if line.startswith('*'):
-                        current_branch = line.strip('* ').strip()
-                        break
-                git_logger.debug(f"Git branches retrieved, current branch: {current_branch}")
+                match = CURRENT_BRANCH_RE.search(branch_result[0].text)
+                current_branch = match.group(1).strip() if match else "unknown"
+                git_logger.debug("Git branches retrieved, current branch: %s", current_branch)
             else:
                 git_logger.warning("Git branch list returned empty result")
         except Exception as e:
@@ -795,7 +1513,9 @@ async def _get_git_context():
             git_info['branch_error'] = str(e)
         
         if git_info:
-            git_logger.info(f"Git context collected: {len(git_info)} elements")
+            git_logger.info("Git context collected: %s elements", len(git_info))
+            if state_key is not None and 'status_error' not in git_info and 'branch_error' not in git_info:
+                git_context_cache.set(state_key, git_info)
         else:
             git_logger.info("No Git context collected")
             
@@ -808,7 +1528,7 @@ async def _get_git_context():
 async def _get_rag_context(question):
     """Get relevant code context using RAG search."""
     try:
-        rag_logger.debug(f"Starting RAG context search for question: '{question[:50]}...'")
+        rag_logger.debug("Starting RAG context search for question: '%.50s...'", question)
         
         if not rag_system:
             rag_logger.warning("RAG system not available")
@@ -821,16 +1541,17 @@ async def _get_rag_context(question):
             'similarity_threshold': 0.3
         }
         
-        rag_logger.debug(f"RAG search parameters: limit={search_params['limit']}, threshold={search_params['similarity_threshold']}")
+        rag_logger.debug("RAG search parameters: limit=%s, threshold=%s", search_params['limit'], search_params['similarity_threshold'])
         
-        search_result = await rag_system.execute_rag_tool('search_code', search_params)
+        # Chat context tolerates the hits of a near-identical earlier question,
+        # so this search may be answered from the semantic cache
+        result_text, _ = await rag_system.search_code_hits(**search_params, approximate=True)
         
-        if search_result and search_result[0]:
-            result_text = search_result[0].text
+        if result_text:
             result_length = len(result_text) if result_text else 0
             
-            rag_logger.info(f"RAG search completed: {result_length} chars of relevant code found")
-            rag_logger.debug(f"RAG result preview: '{result_text[:100]}...' " if result_text else "Empty result")
+            rag_logger.info("RAG search completed: %s chars of relevant code found", result_length)
+            rag_logger.debug("RAG result preview: '%.100s...'", result_text)
             
             return result_text
         else:
@@ -852,44 +1573,16 @@ async def _get_project_structure():
             return None
         
         workspace_path = config.workspace_path
-        web_ui_logger.debug(f"Analyzing project structure at: {workspace_path}")
+        web_ui_logger.debug("Analyzing project structure at: %s", workspace_path)
         
         # Get top-level directories and important files
         try:
-            items = os.listdir(workspace_path)
-            dirs = []
-            files = []
-            
-            important_files = ['readme.md', 'requirements.txt', 'package.json', 'pyproject.toml', 
-                             'setup.py', 'dockerfile', 'docker-compose.yml', 'makefile', 
-                             '.gitignore', 'license']
-            
-            web_ui_logger.debug(f"Found {len(items)} items in workspace root")
-            
-            for item in sorted(items):
-                if item.startswith('.'):
-                    continue
-                item_path = os.path.join(workspace_path, item)
-                if os.path.isdir(item_path):
-                    dirs.append(item)
-                else:
-                    # Only include important files
-                    if item.lower() in important_files:
-                        files.append(item)
-            
-            structure_info = {
-                'directories': dirs[:10],  # Limit to top 10
-                'important_files': files,
-                'total_dirs': len(dirs),
-                'workspace_path': workspace_path
-            }
-            
-            web_ui_logger.info(f"Project structure analyzed: {len(dirs)} directories, {len(files)} important files")
-            web_ui_logger.debug(f"Top directories: {dirs[:5]}")  # Log first 5 directories
-            web_ui_logger.debug(f"Important files found: {files}")
-            
+            _, _, structure_info = await asyncio.get_running_loop().run_in_executor(
+                None, scan_workspace, workspace_path
+            )
+            web_ui_logger.info("Project structure analyzed: %s directories, %s important files",
+                               structure_info['total_dirs'], len(structure_info['important_files']))
             return structure_info
-            
         except Exception as e:
             web_ui_logger.error(f"Failed to analyze project structure: {e}")
             return {'error': str(e)}
@@ -923,38 +1616,30 @@ async def _get_recent_changes():
         git_logger.error(f"Error in recent changes analysis: {e}")
         return None
 
+# Summary lines for context parts that are reported by presence alone
+CONTEXT_SUMMARY_LABELS = (
+    ('git', "Git status included"),
+    ('relevant_code', "Relevant code snippets found"),
+    ('project_structure', "Project structure analyzed"),
+    ('user_context', "User context provided"),
+)
+
+
 @log_function_calls(web_ui_logger)
 def _format_context_summary(enhanced_context):
     """Format context summary for display."""
-    web_ui_logger.debug(f"Formatting context summary for {len(enhanced_context)} context elements")
-    
     summary = []
     
-    if 'workspace' in enhanced_context:
-        workspace = enhanced_context['workspace']
+    workspace = enhanced_context.get('workspace')
+    if workspace is not None:
         if 'name' in workspace:
             summary.append(f"Workspace: {workspace['name']}")
         if 'total_files' in workspace:
             summary.append(f"Files: {workspace['total_files']}")
-        web_ui_logger.debug("Added workspace info to summary")
-    
-    if 'git' in enhanced_context:
-        summary.append("Git status included")
-        web_ui_logger.debug("Added Git info to summary")
-    
-    if 'relevant_code' in enhanced_context:
-        summary.append("Relevant code snippets found")
-        web_ui_logger.debug("Added RAG code snippets to summary")
-    
-    if 'project_structure' in enhanced_context:
-        summary.append("Project structure analyzed")
-        web_ui_logger.debug("Added project structure to summary")
     
-    if 'user_context' in enhanced_context:
-        summary.append("User context provided")
-        web_ui_logger.debug("Added user context to summary")
+    summary.extend(label for key, label in CONTEXT_SUMMARY_LABELS if key in enhanced_context)
     
-    web_ui_logger.info(f"Context summary formatted: {len(summary)} items")
+    web_ui_logger.debug("Context summary formatted: %s items from %s context elements", len(summary), len(enhanced_context))
     return summary
 
 
@@ -963,127 +1648,162 @@ def _format_context_summary(enhanced_context):
 def chat_page():
     """Chat interface page."""
     web_ui_logger.debug("Accessing chat interface page")
-    return render_template('chat.html')
+    return render_static_page('chat.html')
 
 
 @app.route('/api/chat', methods=['POST'])
 @log_function_calls(agent_logger)
+@requires('coder_agent')
 def chat():
     """Enhanced chat with automatic context collection and MCP integration."""
     try:
-        if not coder_agent:
-            agent_logger.error("Coder agent not initialized")
-            return jsonify({'success': False, 'error': 'Coder agent not initialized'})
-            
-        data = request.get_json()
+        data = _json_body()
         question = data.get('question', '')
         user_context = data.get('context', '')
         auto_context = data.get('auto_context', True)  # Enable by default
         
-        agent_logger.debug(f"Chat request: question='{question[:100]}...', auto_context={auto_context}")
+        agent_logger.debug("Chat request: question='%.100s...', auto_context=%s", question, auto_context)
         
         if not question:
             agent_logger.warning("Chat request without question")
-            return jsonify({'success': False, 'error': 'Question is required'})
+            return _bad_request(ERR_NO_QUESTION)
         
-        # Automatically collect comprehensive project context
-        enhanced_context = {}
+        enhanced_context = _collect_chat_context(question, user_context, auto_context)
         
-        if auto_context:
-            agent_logger.debug("Collecting automatic context")
-            try:
-                # 1. Get current workspace information
-                workspace_info = run_async(_get_workspace_context())
-                if workspace_info:
-                    enhanced_context['workspace'] = workspace_info
-                    agent_logger.debug("Workspace context collected")
-                
-                # 2. Get Git status and recent changes
-                git_context = run_async(_get_git_context())
-                if git_context:
-                    enhanced_context['git'] = git_context
-                    agent_logger.debug("Git context collected")
-                
-                # 3. Search RAG for relevant code based on the question
-                rag_context = run_async(_get_rag_context(question))
-                if rag_context:
-                    enhanced_context['relevant_code'] = rag_context
-                    agent_logger.debug("RAG context collected")
-                
-                # 4. Get project structure overview
-                project_structure = run_async(_get_project_structure())
-                if project_structure:
-                    enhanced_context['project_structure'] = project_structure
-                    agent_logger.debug("Project structure context collected")
-                
-                # 5. Get recent file changes if any
-                recent_changes = run_async(_get_recent_changes())
-                if recent_changes:
-                    enhanced_context['recent_changes'] = recent_changes
-                    agent_logger.debug("Recent changes context collected")
-                    
-            except Exception as e:
-                agent_logger.warning(f"Failed to collect auto context: {e}")
-        
-        # Combine user-provided context with auto-collected context
-        if user_context and user_context.strip():
-            enhanced_context['user_context'] = user_context
-            agent_logger.debug("User context added")
+        agent_logger.info("Processing chat request with %s context elements", len(enhanced_context))
         
-        agent_logger.info(f"Processing chat request with {len(enhanced_context)} context elements")
+        if data.get('stream'):
+            return sse_response(_stream_chat(question, enhanced_context))
         
         # Use the coder agent to process the request with enhanced context
         try:
             response = run_async(coder_agent.process_natural_language_request(question, enhanced_context))
         except concurrent.futures.TimeoutError:
             agent_logger.error("Chat request timed out")
-            return jsonify({
-                'success': False, 
-                'error': 'Request timed out. The operation is taking longer than expected. Please try a simpler question or check the agent status.'
-            })
+            return _bad_request(ERR_CHAT_TIMEOUT, status=200)
         
         if response.success:
-            # Format the response for the UI
-            output = response.message
-            if response.data and 'response' in response.data:
-                output = response.data['response']
-            elif response.data:
-                # Include other relevant data in the output
-                data_parts = []
-                for key, value in response.data.items():
-                    if isinstance(value, str) and value.strip():
-                        data_parts.append(f"**{key.replace('_', ' ').title()}:**\n{value}")
-                if data_parts:
-                    output = "\n\n".join(data_parts)
-            
-            # Add suggestions if available
-            if response.suggestions:
-                output += "\n\n**Suggestions:**\n" + "\n".join(f"• {s}" for s in response.suggestions)
-            
-            # Add next actions if available
-            if response.next_actions:
-                output += "\n\n**Next Actions:**\n" + "\n".join(f"→ {a}" for a in response.next_actions)
-            
-            # Include context summary in the response
-            context_summary = _format_context_summary(enhanced_context)
-            
-            agent_logger.info(f"Chat request completed successfully: {len(output)} chars response")
-            
-            return jsonify({
-                'success': True, 
-                'output': output,
-                'context_used': context_summary,
-                'mcp_tools_available': True
-            })
+            return ojson(_chat_payload(response, enhanced_context))
         else:
             agent_logger.error(f"Chat request failed: {response.message}")
-            return jsonify({'success': False, 'error': response.message})
+            return _err(response.message)
             
     except Exception as e:
         agent_logger.exception(f"Chat request failed with exception: {e}")
-        import traceback
         traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
+
+
+async def _collect_auto_context(question, include_recent_changes=True):
+    """Run the context collectors concurrently, leaving out failed or empty ones.
+    
+    Each collector gets its own CONTEXT_TIMEOUT, so a slow git or RAG call
+    only drops its own part of the context.
+    """
+    # Only schedule collectors whose component exists; the others would
+    # just log and return None
+    collectors = {}
+    has_workspace = bool(config and config.workspace_path)
+    if has_workspace:
+        collectors['workspace'] = _get_workspace_context()
+    if git_tools:
+        collectors['git'] = _get_git_context()
+    if rag_system:
+        collectors['relevant_code'] = _get_rag_context(question)
+    if has_workspace:
+        collectors['project_structure'] = _get_project_structure()
+    if include_recent_changes and git_tools:
+        collectors['recent_changes'] = _get_recent_changes()
+    if not collectors:
+        return {}
+    
+    results = await asyncio.gather(
+        *(asyncio.wait_for(collector, CONTEXT_TIMEOUT) for collector in collectors.values()),
+        return_exceptions=True
+    )
+    
+    context = {}
+    for key, result in zip(collectors, results):
+        if isinstance(result, BaseException):
+            agent_logger.warning(f"Failed to collect {key} context: {result!r}")
+        elif result:
+            context[key] = result
+    return context
+
+
+def _collect_chat_context(question, user_context, auto_context):
+    """Gather workspace, git, RAG and project context for a chat question."""
+    # Automatically collect comprehensive project context
+    enhanced_context = {}
+    
+    if auto_context:
+        agent_logger.debug("Collecting automatic context")
+        try:
+            enhanced_context = run_async(_collect_auto_context(question), timeout=CONTEXT_TIMEOUT + 5)
+            agent_logger.debug("Collected context: %s", ', '.join(enhanced_context))
+        except Exception as e:
+            agent_logger.warning(f"Failed to collect auto context: {e}")
+    
+    # Combine user-provided context with auto-collected context
+    if user_context and user_context.strip():
+        enhanced_context['user_context'] = user_context
+        agent_logger.debug("User context added")
+    
+    return enhanced_context
+
+
+def _chat_payload(response, enhanced_context):
+    """Format a successful agent response for the UI."""
+    output = response.message
+    if response.data and 'response' in response.data:
+        output = response.data['response']
+    elif response.data:
+        # Include other relevant data in the output
+        data_parts = []
+        for key, value in response.data.items():
+            if isinstance(value, str) and value.strip():
+                data_parts.append(f"**{key.replace('_', ' ').title()}:**\n{value}")
+        if data_parts:
+            output = "\n\n".join(data_parts)
+    
+    # Add suggestions and next actions if available, joining everything once
+    sections = [output]
+    if response.suggestions:
+        sections.append("\n\n**Suggestions:**\n")
+        sections.append("\n".join([f"• {s}" for s in response.suggestions]))
+    
+    if response.next_actions:
+        sections.append("\n\n**Next Actions:**\n")
+        sections.append("\n".join([f"→ {a}" for a in response.next_actions]))
+    output = "".join(sections)
+    
+    agent_logger.info("Chat request completed successfully: %s chars response", len(output))
+    
+    return {
+        'success': True, 
+        'output': output,
+        'context_used': _format_context_summary(enhanced_context),
+        'mcp_tools_available': True
+    }
+
+
+async def _stream_chat(question, enhanced_context):
+    """Stream the agent's LLM output, then the formatted response as a ``result`` event."""
+    from code_dev_assistant.llm_client import LLMStream
+    
+    stream = LLMStream(coder_agent.process_natural_language_request(question, enhanced_context))
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        stream.cancel()
+    
+    response = stream.result
+    if response.success:
+        yield {'result': _chat_payload(response, enhanced_context)}
+    else:
+        agent_logger.error(f"Chat request failed: {response.message}")
+        yield {'error': response.message}
 
 
 @app.route('/api/chat/context/auto', methods=['POST'])
@@ -1093,60 +1813,40 @@ def chat_context_auto():
     try:
         agent_logger.debug("Auto context preview requested")
         
-        data = request.get_json()
+        data = _json_body()
         question = data.get('question', '')
         
-        agent_logger.debug(f"Context preview for question: '{question[:50]}...'")
+        agent_logger.debug("Context preview for question: '%.50s...'", question)
         
         if not question:
             agent_logger.warning("Context preview requested without question")
-            return jsonify({'success': False, 'error': 'Question is required'})
-        
-        # Collect context preview
-        enhanced_context = {}
-        summary = []
+            return _bad_request(ERR_NO_QUESTION)
         
         agent_logger.debug("Collecting context preview")
+        enhanced_context = run_async(
+            _collect_auto_context(question, include_recent_changes=False), timeout=CONTEXT_TIMEOUT + 5
+        )
         
-        # Get workspace context
-        workspace_context = run_async(_get_workspace_context())
-        if workspace_context:
-            enhanced_context['workspace'] = workspace_context
-            if 'name' in workspace_context:
-                summary.append(f"Workspace: {workspace_context['name']}")
-            agent_logger.debug("Workspace context collected for preview")
-        
-        # Get git context
-        git_context = run_async(_get_git_context())
-        if git_context:
-            enhanced_context['git'] = git_context
+        summary = []
+        if 'name' in enhanced_context.get('workspace', {}):
+            summary.append(f"Workspace: {enhanced_context['workspace']['name']}")
+        if 'git' in enhanced_context:
             summary.append("Git status available")
-            agent_logger.debug("Git context collected for preview")
-        
-        # Get relevant code context via RAG
-        rag_context = run_async(_get_rag_context(question))
-        if rag_context:
-            enhanced_context['relevant_code'] = rag_context
+        if 'relevant_code' in enhanced_context:
             summary.append("Relevant code found")
-            agent_logger.debug("RAG context collected for preview")
-        
-        # Get project structure
-        structure_context = run_async(_get_project_structure())
-        if structure_context:
-            enhanced_context['project_structure'] = structure_context
+        if 'project_structure' in enhanced_context:
             summary.append("Project structure analyzed")
-            agent_logger.debug("Project structure collected for preview")
         
         agent_logger.info(f"Context preview completed: {len(summary)} context elements")
         
-        return jsonify({
+        return ojson({
             'success': True,
             'summary': summary,
             'context_preview': enhanced_context
         })
     except Exception as e:
         agent_logger.exception(f"Context preview failed: {e}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e),
             'summary': ['Error collecting context'],
@@ -1154,187 +1854,92 @@ def chat_context_auto():
         })
 
 
+# Static /api/mcp/tools inventory: (category, component required, tools).
+# The response only varies with which components are initialized, so each
+# combination is serialized once.
+MCP_TOOL_GROUPS = (
+    ('git', 'git_tools', (
+        ('git_status', 'Get current git repository status'),
+        ('git_diff', 'Show file differences'),
+        ('git_log', 'View commit history'),
+        ('git_branch', 'Manage git branches'),
+    )),
+    ('rag', 'rag_system', (
+        ('rag_search', 'Search codebase with semantic similarity'),
+        ('rag_index', 'Index codebase for semantic search'),
+        ('rag_context', 'Get contextual code information'),
+    )),
+    ('analysis', 'code_analyzer', (
+        ('code_analyze', 'Analyze code structure and patterns'),
+        ('code_explain', 'Explain code functionality'),
+        ('code_refactor', 'Suggest code improvements'),
+    )),
+    ('files', None, (
+        ('file_read', 'Read file contents'),
+        ('file_write', 'Write file contents'),
+        ('file_list', 'List directory contents'),
+    )),
+    ('context', None, (
+        ('project_structure', 'Get project structure overview'),
+        ('workspace_info', 'Get current workspace information'),
+        ('auto_context', 'Automatically collect project context'),
+    )),
+)
+
+
+@functools.lru_cache(maxsize=16)
+def mcp_tools_body(has_git, has_rag, has_analyzer, has_agent):
+    """Serialize the MCP tools inventory for the given component availability."""
+    mcp_status = {
+        'git_tools': has_git,
+        'rag_system': has_rag,
+        'code_analyzer': has_analyzer,
+        'coder_agent': has_agent
+    }
+    tools = []
+    categories = []
+    for category, component, descriptors in MCP_TOOL_GROUPS:
+        if component is not None and not mcp_status[component]:
+            web_ui_logger.warning(f"{component} not available for MCP inventory")
+            continue
+        categories.append(category)
+        tools.extend(
+            {'name': name, 'description': description, 'category': category, 'available': True}
+            for name, description in descriptors
+        )
+    web_ui_logger.info(f"MCP tools inventory built: {len(tools)} tools across {len(categories)} categories")
+    return orjson.dumps({
+        'success': True,
+        'tools': tools,
+        'total_tools': len(tools),
+        'categories': categories,
+        'mcp_status': mcp_status
+    })
+
+
 @app.route('/api/mcp/tools')
 @log_function_calls(web_ui_logger)
 def get_mcp_tools():
     """Get available MCP tools and capabilities."""
     try:
         web_ui_logger.debug("MCP tools inventory requested")
-        
-        tools = []
-        
-        # Add available MCP tools from different components
-        if git_tools:
-            git_tool_count = 4
-            tools.extend([
-                {
-                    'name': 'git_status',
-                    'description': 'Get current git repository status',
-                    'category': 'git',
-                    'available': True
-                },
-                {
-                    'name': 'git_diff',
-                    'description': 'Show file differences',
-                    'category': 'git',
-                    'available': True
-                },
-                {
-                    'name': 'git_log',
-                    'description': 'View commit history',
-                    'category': 'git',
-                    'available': True
-                },
-                {
-                    'name': 'git_branch',
-                    'description': 'Manage git branches',
-                    'category': 'git',
-                    'available': True
-                }
-            ])
-            web_ui_logger.debug(f"Added {git_tool_count} Git tools to MCP inventory")
-        else:
-            web_ui_logger.warning("Git tools not available for MCP inventory")
-        
-        if rag_system:
-            rag_tool_count = 3
-            tools.extend([
-                {
-                    'name': 'rag_search',
-                    'description': 'Search codebase with semantic similarity',
-                    'category': 'rag',
-                    'available': True
-                },
-                {
-                    'name': 'rag_index',
-                    'description': 'Index codebase for semantic search',
-                    'category': 'rag',
-                    'available': True
-                },
-                {
-                    'name': 'rag_context',
-                    'description': 'Get contextual code information',
-                    'category': 'rag',
-                    'available': True
-                }
-            ])
-            web_ui_logger.debug(f"Added {rag_tool_count} RAG tools to MCP inventory")
-        else:
-            web_ui_logger.warning("RAG system not available for MCP inventory")
-        
-        if code_analyzer:
-            analyzer_tool_count = 1
-            tools.extend([
-                {
-                    'name': 'code_analyze',
-                    'description': 'Analyze code structure and patterns',
-                    'category': 'analysis',
-                    'available': True
-                },
-                {
-                    'name': 'code_explain',
-                    'description': 'Explain code functionality',
-                    'category': 'analysis',
-                    'available': True
-                },
-                {
-                    'name': 'code_refactor',
-                    'description': 'Suggest code improvements',
-                    'category': 'analysis',
-                    'available': True
-                }
-            ])
-            web_ui_logger.debug(f"Added {analyzer_tool_count} analysis tools to MCP inventory")
-        else:
-            web_ui_logger.warning("Code analyzer not available for MCP inventory")
-        
-        # Add file operations tools
-        file_tool_count = 3
-        tools.extend([
-            {
-                'name': 'file_read',
-                'description': 'Read file contents',
-                'category': 'files',
-                'available': True
-            },
-            {
-                'name': 'file_write',
-                'description': 'Write file contents',
-                'category': 'files',
-                'available': True
-            },
-            {
-                'name': 'file_list',
-                'description': 'List directory contents',
-                'category': 'files',
-                'available': True
-            }
-        ])
-        web_ui_logger.debug(f"Added {file_tool_count} file operation tools to MCP inventory")
-        
-        # Add project context tools
-        context_tool_count = 3
-        tools.extend([
-            {
-                'name': 'project_structure',
-                'description': 'Get project structure overview',
-                'category': 'context',
-                'available': True
-            },
-            {
-                'name': 'workspace_info',
-                'description': 'Get current workspace information',
-                'category': 'context',
-                'available': True
-            },
-            {
-                'name': 'auto_context',
-                'description': 'Automatically collect project context',
-                'category': 'context',
-                'available': True
-            }
-        ])
-        web_ui_logger.debug(f"Added {context_tool_count} context tools to MCP inventory")
-        
-        total_tools = len(tools)
-        categories = list(set(tool['category'] for tool in tools))
-        
-        web_ui_logger.info(f"MCP tools inventory completed: {total_tools} tools across {len(categories)} categories")
-        web_ui_logger.debug(f"Available categories: {categories}")
-        
-        return jsonify({
-            'success': True,
-            'tools': tools,
-            'total_tools': total_tools,
-            'categories': categories,
-            'mcp_status': {
-                'git_tools': git_tools is not None,
-                'rag_system': rag_system is not None,
-                'code_analyzer': code_analyzer is not None,
-                'coder_agent': coder_agent is not None
-            }
-        })
+        body = mcp_tools_body(
+            git_tools is not None,
+            rag_system is not None,
+            code_analyzer is not None,
+            coder_agent is not None
+        )
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         web_ui_logger.exception(f"MCP tools inventory failed: {e}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e),
             'tools': [],
             'total_tools': 0,
             'categories': []
         })
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'tools': [],
-            'mcp_status': {
-                'git_tools': False,
-                'rag_system': False,
-                'code_analyzer': False,
-                'coder_agent': False
-            }
-        })
 
 
 @app.route('/settings')
@@ -1343,7 +1948,109 @@ def settings_page():
     """Settings page."""
     web_ui_logger.debug("Accessing settings page")
     web_ui_logger.debug(f"Current config available: {config is not None}")
-    return render_template('settings.html', config=config)
+    return render_static_page('settings.html', with_config=True)
+
+
+# Search suggestions derived from the comprehensive RAG test results. They never
+# change at runtime, so the response body and its ETag are built once.
+# Quick search templates on rag.html as (query, similarity_threshold, filter_type),
+# mirroring what useTemplate() fills in with the default 10 result limit
+RAG_WARMUP_QUERIES = (
+    ('class definition with methods', 0.3, 'classdef'),
+    ('function implementation with parameters', 0.3, 'functiondef'),
+    ('import modules and dependencies', 0.2, 'import'),
+    ('analyze and parse source code', 0.3, None),
+    ('handle errors and exceptions', 0.3, None),
+    ('initialize configuration and setup', 0.3, None),
+)
+
+RAG_SEARCH_SUGGESTIONS = {
+    'high_success_queries': [
+        {
+            'query': 'class definition with methods',
+            'description': 'Find class definitions and their methods',
+            'success_rate': '100%',
+            'avg_similarity': '0.265',
+            'recommended_threshold': 0.15,
+            'filters': {'type': 'classdef'}
+        },
+        {
+            'query': 'function implementation with parameters',
+            'description': 'Find function implementations',
+            'success_rate': '100%',
+            'avg_similarity': '0.25+',
+            'recommended_threshold': 0.15,
+            'filters': {'type': 'functiondef'}
+        },
+        {
+            'query': 'import modules and dependencies',
+            'description': 'Find import statements',
+            'success_rate': '100%',
+            'avg_similarity': '0.444',
+            'recommended_threshold': 0.15,
+            'filters': {'type': 'import'}
+        },
+        {
+            'query': 'analyze and parse source code',
+            'description': 'Find code analysis functionality',
+            'success_rate': '100%',
+            'avg_similarity': '0.454',
+            'recommended_threshold': 0.15,
+            'filters': {}
+        },
+        {
+            'query': 'handle errors and exceptions gracefully',
+            'description': 'Find error handling patterns',
+            'success_rate': '100%',
+            'avg_similarity': '0.3+',
+            'recommended_threshold': 0.10,
+            'filters': {}
+        },
+        {
+            'query': 'initialize configuration and setup',
+            'description': 'Find initialization code',
+            'success_rate': '100%',
+            'avg_similarity': '0.3+',
+            'recommended_threshold': 0.15,
+            'filters': {}
+        }
+    ],
+    'optimal_settings': {
+        'similarity_threshold': {
+            'recommended': 0.3,
+            'range': [0.2, 0.4],
+            'note': 'Based on 81.8% test success rate'
+        },
+        'result_limit': {
+            'recommended': 10,
+            'note': 'Good balance of coverage and relevance'
+        },
+        'filters': {
+            'language': 'Use when targeting specific languages (100% success)',
+            'type': 'Use when targeting specific code types (100% success)'
+        }
+    },
+    'troubleshooting': {
+        'no_results': [
+            'Lower similarity threshold to 0.1-0.2',
+            'Remove all filters',
+            'Use broader search terms',
+            'Try search templates'
+        ],
+        'too_many_results': [
+            'Raise similarity threshold to 0.4+',
+            'Add language or type filters',
+            'Use more specific terms'
+        ],
+        'low_quality_results': [
+            'Check if codebase is properly indexed',
+            'Use more descriptive search terms',
+            'Try semantic queries instead of exact matches'
+        ]
+    }
+}
+_SUGGESTIONS_JSON = _dumps_fast({'success': True, 'suggestions': RAG_SEARCH_SUGGESTIONS})
+_SUGGESTIONS_ETAG = hashlib.sha1(_SUGGESTIONS_JSON).hexdigest()
 
 
 @app.route('/api/rag/suggestions')
@@ -1351,150 +2058,54 @@ def settings_page():
 def rag_suggestions():
     """Get search suggestions based on comprehensive test results."""
     rag_logger.debug("RAG search suggestions requested")
-    
-    # Based on the test results, these are the most successful query patterns
-    suggestions = {
-        'high_success_queries': [
-            {
-                'query': 'class definition with methods',
-                'description': 'Find class definitions and their methods',
-                'success_rate': '100%',
-                'avg_similarity': '0.265',
-                'recommended_threshold': 0.15,
-                'filters': {'type': 'classdef'}
-            },
-            {
-                'query': 'function implementation with parameters',
-                'description': 'Find function implementations',
-                'success_rate': '100%',
-                'avg_similarity': '0.25+',
-                'recommended_threshold': 0.15,
-                'filters': {'type': 'functiondef'}
-            },
-            {
-                'query': 'import modules and dependencies',
-                'description': 'Find import statements',
-                'success_rate': '100%',
-                'avg_similarity': '0.444',
-                'recommended_threshold': 0.15,
-                'filters': {'type': 'import'}
-            },
-            {
-                'query': 'analyze and parse source code',
-                'description': 'Find code analysis functionality',
-                'success_rate': '100%',
-                'avg_similarity': '0.454',
-                'recommended_threshold': 0.15,
-                'filters': {}
-            },
-            {
-                'query': 'handle errors and exceptions gracefully',
-                'description': 'Find error handling patterns',
-                'success_rate': '100%',
-                'avg_similarity': '0.3+',
-                'recommended_threshold': 0.10,
-                'filters': {}
-            },
-            {
-                'query': 'initialize configuration and setup',
-                'description': 'Find initialization code',
-                'success_rate': '100%',
-                'avg_similarity': '0.3+',
-                'recommended_threshold': 0.15,
-                'filters': {}
-            }
-        ],
-        'optimal_settings': {
-            'similarity_threshold': {
-                'recommended': 0.3,
-                'range': [0.2, 0.4],
-                'note': 'Based on 81.8% test success rate'
-            },
-            'result_limit': {
-                'recommended': 10,
-                'note': 'Good balance of coverage and relevance'
-            },
-            'filters': {
-                'language': 'Use when targeting specific languages (100% success)',
-                'type': 'Use when targeting specific code types (100% success)'
-            }
-        },
-        'troubleshooting': {
-            'no_results': [
-                'Lower similarity threshold to 0.1-0.2',
-                'Remove all filters',
-                'Use broader search terms',
-                'Try search templates'
-            ],
-            'too_many_results': [
-                'Raise similarity threshold to 0.4+',
-                'Add language or type filters',
-                'Use more specific terms'
-            ],
-            'low_quality_results': [
-                'Check if codebase is properly indexed',
-                'Use more descriptive search terms',
-                'Try semantic queries instead of exact matches'
-            ]
-        }
-    }
-    
-    rag_logger.info(f"RAG suggestions returned: {len(suggestions['high_success_queries'])} high-success queries")
-    rag_logger.debug("RAG suggestions included optimal settings and troubleshooting tips")
-    
-    return jsonify({'success': True, 'suggestions': suggestions})
+    response = Response(_SUGGESTIONS_JSON, mimetype='application/json')
+    response.set_etag(_SUGGESTIONS_ETAG)
+    return response.make_conditional(request)
 
 
 @app.route('/api/agent/status')
 @log_function_calls(agent_logger)
+@requires('coder_agent')
 def agent_status():
     """Get coder agent status and capabilities."""
     try:
         agent_logger.debug("Agent status requested")
         
-        if not coder_agent:
-            agent_logger.error("Agent status requested but coder agent not initialized")
-            return jsonify({'success': False, 'error': 'Coder agent not initialized'})
-        
         # Get agent status
         try:
             agent_logger.debug("Fetching agent status from coder agent")
-            result = run_async(coder_agent.execute_agent_tool('get_agent_status', {}))
+            result = run_async(coder_agent.execute_agent_tool('get_agent_status', EMPTY_ARGS), timeout=STATUS_TIMEOUT)
             agent_info = result[0].text if result else '{}'
             
             agent_logger.debug(f"Agent status raw result: {len(agent_info)} chars")
             
             try:
-                import json
-                status_data = json.loads(agent_info)
+                status_data = orjson.loads(agent_info)
                 agent_logger.info("Agent status successfully parsed from JSON")
             except Exception as parse_error:
                 agent_logger.warning(f"Failed to parse agent status JSON: {parse_error}")
                 status_data = {'error': 'Could not parse agent status', 'raw_info': agent_info[:200]}
             
-            return jsonify({'success': True, 'status': status_data})
+            return ojson({'success': True, 'status': status_data})
             
         except Exception as e:
             agent_logger.error(f"Failed to execute agent status tool: {e}")
-            return jsonify({'success': False, 'error': f'Agent status tool failed: {str(e)}'})
+            return _err(f'Agent status tool failed: {str(e)}')
             
     except Exception as e:
         agent_logger.exception(f"Agent status endpoint failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 
 @app.route('/api/agent/initialize', methods=['POST'])
 @log_function_calls(agent_logger)
+@requires('coder_agent')
 def agent_initialize():
     """Initialize agent project context."""
     try:
         agent_logger.debug("Agent initialization requested")
         
-        if not coder_agent:
-            agent_logger.error("Agent initialization requested but coder agent not available")
-            return jsonify({'success': False, 'error': 'Coder agent not initialized'})
-        
-        data = request.get_json()
+        data = _json_body()
         project_path = data.get('project_path', '.')
         
         agent_logger.debug(f"Initializing agent project context for path: {project_path}")
@@ -1502,16 +2113,16 @@ def agent_initialize():
         # Validate project path
         if not os.path.exists(project_path):
             agent_logger.error(f"Project path does not exist: {project_path}")
-            return jsonify({'success': False, 'error': 'Project path does not exist'})
+            return _bad_request(ERR_PROJECT_PATH_MISSING)
         
         try:
-            response = run_async(coder_agent.initialize_project_context(project_path))
+            response = run_async(coder_agent.initialize_project_context(project_path), timeout=None)
             
             agent_logger.info(f"Agent initialization completed: success={response.success}")
             if response.suggestions:
                 agent_logger.debug(f"Agent provided {len(response.suggestions)} suggestions")
             
-            return jsonify({
+            return ojson({
                 'success': response.success,
                 'message': response.message,
                 'suggestions': response.suggestions or []
@@ -1519,14 +2130,13 @@ def agent_initialize():
             
         except Exception as e:
             agent_logger.error(f"Agent initialization failed during execution: {e}")
-            return jsonify({'success': False, 'error': f'Initialization failed: {str(e)}'})
+            return _err(f'Initialization failed: {str(e)}')
             
     except Exception as e:
         agent_logger.exception(f"Agent initialization endpoint failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 @app.route('/api/initialization_status')
-@log_function_calls(web_ui_logger)
 def get_initialization_status():
     """Check if the system needs initial setup (codebase selection)."""
     try:
@@ -1537,15 +2147,15 @@ def get_initialization_status():
         web_ui_logger.debug("Checking initialization status")
         
         # Check if workspace is configured
-        if config and config.workspace_path and os.path.exists(config.workspace_path):
+        if config and config.workspace_path and workspace_exists(config.workspace_path):
             workspace_configured = True
             web_ui_logger.debug(f"Workspace configured: {config.workspace_path}")
-        elif current_workspace_path and os.path.exists(current_workspace_path):
+        elif current_workspace_path and workspace_exists(current_workspace_path):
             workspace_configured = True
             web_ui_logger.debug(f"Current workspace: {current_workspace_path}")
             
         # Check if core components are initialized
-        if coder_agent and git_tools and rag_system:
+        if git_tools and ((coder_agent and rag_system) or _pending_component_build):
             components_initialized = True
             web_ui_logger.debug("Core components initialized")
             
@@ -1554,7 +2164,7 @@ def get_initialization_status():
         
         web_ui_logger.info(f"Initialization status: needs_setup={needs_setup}, workspace_configured={workspace_configured}, components_initialized={components_initialized}")
         
-        return jsonify({
+        return ojson({
             'success': True,
             'needs_setup': needs_setup,
             'workspace_configured': workspace_configured,
@@ -1564,7 +2174,7 @@ def get_initialization_status():
         })
     except Exception as e:
         web_ui_logger.exception(f"Failed to check initialization status: {e}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e),
             'needs_setup': True,
@@ -1579,19 +2189,21 @@ def select_workspace():
     global current_workspace_path
     
     try:
-        data = request.get_json()
+        data = _json_body()
         workspace_path = data.get('workspace_path', '').strip()
         
         web_ui_logger.debug(f"Workspace selection requested: {workspace_path}")
         
         if not workspace_path:
             web_ui_logger.warning("Workspace selection attempted without path")
-            return jsonify({'success': False, 'error': 'Workspace path is required'})
+            return _bad_request(ERR_NO_WORKSPACE_PATH)
         
         # Validate the directory
-        if not os.path.isdir(workspace_path):
+        validated_path = validated_workspace(workspace_path)
+        if validated_path is None:
             web_ui_logger.error(f"Invalid workspace directory: {workspace_path}")
-            return jsonify({'success': False, 'error': 'Invalid directory'})
+            return _bad_request(ERR_INVALID_DIRECTORY)
+        workspace_path = validated_path
         
         # Update the current workspace path
         current_workspace_path = workspace_path
@@ -1600,31 +2212,32 @@ def select_workspace():
         # Update the config and reinitialize components
         if config:
             config.workspace_path = workspace_path
+            invalidate_config_json()
             web_ui_logger.debug("Configuration updated with new workspace path")
         
-        success = reinitialize_components(workspace_path)
+        success = reinitialize_components(workspace_path, eager=False)
         
         if success:
+            start_workspace_setup(workspace_path)
             web_ui_logger.info(f"Components successfully reinitialized for workspace: {workspace_path}")
         else:
             web_ui_logger.warning(f"Components reinitialization failed for workspace: {workspace_path}")
         
-        return jsonify({
+        return ojson({
             'success': success,
             'message': 'Workspace selected and components reinitialized' if success else 'Workspace selected, but components initialization failed',
             'workspace_path': current_workspace_path
         })
     except Exception as e:
         web_ui_logger.exception(f"Workspace selection failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 
 @app.route('/api/workspace/current')
-@log_function_calls(web_ui_logger)
 def get_current_workspace():
     """Get the currently selected workspace directory."""
     web_ui_logger.debug(f"Current workspace requested: {current_workspace_path}")
-    return jsonify({
+    return ojson({
         'success': True,
         'workspace_path': current_workspace_path
     })
@@ -1635,23 +2248,37 @@ def get_current_workspace():
 def browse_directory():
     """Browse a directory and list its contents."""
     try:
-        data = request.get_json()
+        data = _json_body()
         directory = data.get('directory', current_workspace_path)
         
         web_ui_logger.debug(f"Directory browse requested: {directory}")
         
-        if not os.path.isdir(directory):
+        st = directory_stat(directory)
+        if st is None:
             web_ui_logger.error(f"Invalid directory for browsing: {directory}")
-            return jsonify({'success': False, 'error': 'Invalid directory'})
-        
-        # List directory contents
-        contents = os.listdir(directory)
-        files = [f for f in contents if os.path.isfile(os.path.join(directory, f))]
-        subdirs = [d for d in contents if os.path.isdir(os.path.join(directory, d))]
+            return _bad_request(ERR_INVALID_DIRECTORY)
+        
+        # List directory contents unless it is unchanged since the last
+        # listing; DirEntry answers is_file/is_dir from the listing itself, so
+        # only symlinks cost an extra stat
+        key = (os.path.abspath(directory), st.st_mtime_ns, st.st_ino)
+        cached = directory_listing_cache.get(key)
+        if cached is None:
+            files = []
+            subdirs = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        files.append(entry.name)
+                    elif entry.is_dir():
+                        subdirs.append(entry.name)
+            directory_listing_cache.set(key, (files, subdirs))
+        else:
+            files, subdirs = cached
         
         web_ui_logger.debug(f"Directory browse completed: {len(files)} files, {len(subdirs)} subdirs")
         
-        return jsonify({
+        return ojson({
             'success': True,
             'directory': directory,
             'files': files,
@@ -1659,75 +2286,82 @@ def browse_directory():
         })
     except Exception as e:
         web_ui_logger.exception(f"Directory browse failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 
 @app.route('/api/browse_directories', methods=['POST'])
 @log_function_calls(web_ui_logger)
 def browse_directories():
-    """Browse directories for codebase selection."""
+    """Browse directories for codebase selection.
+    
+    The response carries a weak ETag built from the directory's mtime and
+    inode; a client that sends it back in ``If-None-Match`` gets a 304
+    without the directory being read. Project flags of subdirectories are not
+    part of the tag, so the picker's refresh button skips the revalidation.
+    """
     try:
-        data = request.get_json()
+        data = _json_body()
         path = data.get('path', os.path.expanduser('~'))
         
         web_ui_logger.debug(f"Directory browsing requested: {path}")
         
-        # Expand user path first, then normalize
-        path = os.path.expanduser(path)
-        path = os.path.abspath(path)
-        if not os.path.exists(path) or not os.path.isdir(path):
+        # Expand user path first, then normalize and check it with one stat
+        path = os.path.abspath(os.path.expanduser(path))
+        st = directory_stat(path)
+        if st is None:
             web_ui_logger.error(f"Invalid directory path for browsing: {path}")
-            return jsonify({'success': False, 'error': 'Invalid directory path'})
+            return _bad_request(ERR_INVALID_DIRECTORY_PATH)
         
-        # Get directory contents
-        directories = []
-        files = []
+        limit = max(int(data.get('limit') or BROWSE_LIMIT), 1)
+        etag = f'{st.st_mtime_ns:x}-{st.st_ino:x}-{limit}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
         
+        # Get directory contents, cut to the first ``limit`` entries by name
         try:
-            for item in sorted(os.listdir(path)):
-                item_path = os.path.join(path, item)
-                
-                # Skip hidden files/directories except important ones
-                if item.startswith('.') and item not in ['.git', '.github', '.vscode']:
-                    continue
-                
-                if os.path.isdir(item_path):
-                    # Check if it's a potential code project
-                    is_project = any(os.path.exists(os.path.join(item_path, indicator)) 
-                                   for indicator in ['.git', 'package.json', 'pyproject.toml', 'setup.py', 'Cargo.toml', 'go.mod'])
-                    
-                    directories.append({
-                        'name': item,
-                        'path': item_path,
-                        'is_project': is_project
-                    })
-                else:
-                    # Only include important files
-                    if item in ['README.md', 'package.json', 'pyproject.toml', 'setup.py', 'Cargo.toml', 'go.mod']:
-                        files.append({
-                            'name': item,
-                            'path': item_path
-                        })
+            subdirs, files, total = list_picker_directory(path, st, limit)
         except PermissionError:
             web_ui_logger.error(f"Permission denied accessing directory: {path}")
-            return jsonify({'success': False, 'error': 'Permission denied to access directory'})
+            return _bad_request(ERR_PERMISSION_DENIED, status=403)
+        
+        directories = [
+            {'name': name, 'path': subdir_path, 'is_project': False}
+            for name, subdir_path in subdirs
+        ]
+        
+        # Check if subdirectories are potential code projects; with several of
+        # them the probes overlap on the pool instead of waiting on each other
+        subdir_paths = [subdir_path for _, subdir_path in subdirs]
+        if len(subdir_paths) >= FS_PARALLEL_MIN:
+            project_flags = app.config['FS_POOL'].map(is_project_dir, subdir_paths)
+        else:
+            project_flags = map(is_project_dir, subdir_paths)
+        for directory, is_project in zip(directories, project_flags):
+            directory['is_project'] = is_project
         
         # Get parent directory
         parent = os.path.dirname(path) if path != os.path.dirname(path) else None
         
         web_ui_logger.debug(f"Directory browsing completed: {len(directories)} dirs, {len(files)} files")
         
-        return jsonify({
+        response = ojson({
             'success': True,
             'current_path': path,
             'parent_path': parent,
             'directories': directories,
-            'files': files
+            'files': files,
+            'total': total,
+            'truncated': len(directories) + len(files) < total
         })
+        response.set_etag(etag, weak=True)
+        response.last_modified = st.st_mtime
+        return response
         
     except Exception as e:
         web_ui_logger.exception(f"Directory browsing failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 
 @app.route('/api/select_codebase', methods=['POST'])
@@ -1737,20 +2371,32 @@ def select_codebase():
     global current_workspace_path, config, git_tools, code_analyzer, rag_system, llm_client, coder_agent
     
     try:
-        data = request.get_json()
+        data = _json_body()
         workspace_path = data.get('workspace_path')
         
         web_ui_logger.debug(f"Codebase selection requested: {workspace_path}")
         
         if not workspace_path:
             web_ui_logger.warning("Codebase selection attempted without path")
-            return jsonify({'success': False, 'error': 'Workspace path is required'})
+            return _bad_request(ERR_NO_WORKSPACE_PATH)
         
         # Validate the path
-        workspace_path = os.path.abspath(workspace_path)
-        if not os.path.exists(workspace_path) or not os.path.isdir(workspace_path):
+        validated_path = validated_workspace(workspace_path)
+        if validated_path is None:
             web_ui_logger.error(f"Invalid workspace path: {workspace_path}")
-            return jsonify({'success': False, 'error': 'Invalid workspace path'})
+            return _bad_request(ERR_INVALID_WORKSPACE_PATH)
+        workspace_path = validated_path
+        
+        # Re-selecting the active codebase keeps its components and index
+        # unless the client asks for a rebuild
+        if not data.get('force') and workspace_is_active(workspace_path):
+            web_ui_logger.info(f"Codebase already active, skipping reinitialization: {workspace_path}")
+            return ojson({
+                'success': True,
+                'message': f'Codebase already initialized: {workspace_path}',
+                'workspace_path': workspace_path,
+                'cached': True
+            })
         
         # Update the current workspace path
         current_workspace_path = workspace_path
@@ -1759,40 +2405,38 @@ def select_codebase():
         # Update config if it exists
         if config:
             config.workspace_path = workspace_path
+            invalidate_config_json()
             web_ui_logger.debug("Configuration updated with new codebase path")
         
         # Reinitialize components with new workspace path
-        success = reinitialize_components(workspace_path)
+        success = reinitialize_components(workspace_path, eager=False)
         
         if success:
+            start_workspace_setup(workspace_path)
             web_ui_logger.info(f"Components successfully reinitialized for codebase: {workspace_path}")
-            return jsonify({
+            return ojson({
                 'success': True,
                 'message': f'Successfully initialized codebase: {workspace_path}',
                 'workspace_path': workspace_path
             })
         else:
             web_ui_logger.error(f"Failed to reinitialize components for codebase: {workspace_path}")
-            return jsonify({
-                'success': False,
-                'error': 'Failed to initialize some components. Check logs for details.'
-            })
+            return _bad_request(ERR_COMPONENT_INIT_FAILED, status=200)
             
     except Exception as e:
         web_ui_logger.exception(f"Codebase selection failed: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return _err(str(e))
 
 
 @app.route('/api/current_codebase')
-@log_function_calls(web_ui_logger)
 def get_current_codebase():
     """Get the current selected codebase."""
     workspace_path = current_workspace_path or (config.workspace_path if config else None)
-    is_initialized = bool(coder_agent)
+    is_initialized = bool(coder_agent or _pending_component_build)
     
     web_ui_logger.debug(f"Current codebase requested: path={workspace_path}, initialized={is_initialized}")
     
-    return jsonify({
+    return ojson({
         'success': True,
         'workspace_path': workspace_path,
         'is_initialized': is_initialized
@@ -1800,21 +2444,256 @@ def get_current_codebase():
 
 
 @log_function_calls(web_ui_logger)
-def reinitialize_components(workspace_path):
-    """Reinitialize all components with a new workspace path."""
+def _setup_workspace_backends(workspace_path, rag, agent):
+    """Load the embedding model and build the agent's project context (slow)."""
+    try:
+        web_ui_logger.debug("Initializing RAG system database")
+        run_async(rag.initialize(), timeout=None)
+        web_ui_logger.info(f"✅ RAG system initialized for workspace: {workspace_path}")
+    except Exception as e:
+        web_ui_logger.warning(f"RAG system initialization failed: {e}")
+    
+    try:
+        web_ui_logger.debug("Initializing project context")
+        run_async(agent.initialize_project_context(workspace_path), timeout=None)
+        web_ui_logger.info(f"✅ Coder agent initialized for workspace: {workspace_path}")
+    except Exception as e:
+        web_ui_logger.warning(f"Coder agent initialization failed: {e}")
+
+
+@app.before_request
+def ensure_workspace_backends():
+    """Run setup deferred at startup before the first request that needs it."""
+    if request.path in NO_SETUP_PATHS:
+        return None
+    if _pending_component_build is not None and request.path.startswith(COMPONENT_BUILD_PREFIXES):
+        run_deferred_setup(include_backends=False)
+    if _pending_workspace_setup is not None and request.path.startswith(DEFERRED_SETUP_PREFIXES):
+        run_deferred_setup()
+    return None
+
+
+def run_deferred_setup(include_backends=True):
+    """Construct pending components and, unless told otherwise, run the pending backend setup.
+    
+    Construction is quick and happens under ``_components_lock``. The backend
+    setup runs outside it, so selecting another workspace never waits for an
+    indexing run: the selection starts a new generation, and a caller whose
+    generation was superseded moves on to the new workspace's setup. The
+    first caller of a generation does its setup; later ones wait for it.
+    """
+    global _pending_workspace_setup, _pending_component_build, _backend_setup_started
+    while True:
+        with _components_lock:
+            workspace_path = _pending_component_build
+            if workspace_path is not None:
+                try:
+                    _build_components(workspace_path)
+                except Exception as e:
+                    web_ui_logger.exception(f"Deferred component construction failed: {e}")
+                finally:
+                    _pending_component_build = None
+            
+            workspace_path = _pending_workspace_setup
+            if not include_backends or workspace_path is None:
+                return
+            generation = _workspace_generation
+            ready = _backend_ready
+            owner = not _backend_setup_started
+            _backend_setup_started = True
+            rag, agent = rag_system, coder_agent
+        
+        if owner:
+            try:
+                _setup_workspace_backends(workspace_path, rag, agent)
+            finally:
+                with _components_lock:
+                    if _workspace_generation == generation:
+                        _pending_workspace_setup = None
+                ready.set()
+        else:
+            ready.wait()
+        
+        with _components_lock:
+            if _workspace_generation == generation:
+                return
+        web_ui_logger.debug(f"Setup for {workspace_path} was superseded by a newer selection")
+
+
+def workspace_is_active(workspace_path):
+    """Whether the components are already built (or pending) for ``workspace_path``."""
+    if current_workspace_path != workspace_path or not config or config.workspace_path != workspace_path:
+        return False
+    return bool(git_tools and ((coder_agent and rag_system) or _pending_component_build == workspace_path))
+
+
+# Source files the indexer reads by default, prefetched after a selection
+PREFETCH_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.java', '.go', '.rs', '.cpp', '.c', '.h'})
+PREFETCH_MAX_FILES = 10000
+
+
+def prefetch_workspace(workspace_path, max_files=PREFETCH_MAX_FILES):
+    """Ask the kernel to start reading the workspace's source files (Linux).
+    
+    ``posix_fadvise(WILLNEED)`` queues readahead without waiting for it, so
+    indexing and analysis that follow find the files in the page cache
+    instead of paying cold-disk latency one file at a time.
+    """
+    flags = os.O_RDONLY | os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0)
+    remaining = max_files
+    stack = [workspace_path]
+    while stack and remaining > 0:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in WORKSPACE_SKIP_DIRS:
+                            stack.append(entry.path)
+                        continue
+                    if os.path.splitext(name)[1] not in PREFETCH_EXTENSIONS:
+                        continue
+                    try:
+                        fd = os.open(entry.path, flags)
+                    except OSError:
+                        continue
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                    remaining -= 1
+                    if not remaining:
+                        break
+        except OSError as e:
+            web_ui_logger.debug("Skipping directory during workspace prefetch: %s", e)
+    web_ui_logger.debug("Prefetched %s source files for %s", max_files - remaining, workspace_path)
+
+
+def start_workspace_setup(workspace_path):
+    """Run the deferred workspace setup in a background thread.
+    
+    Used after a workspace is selected so the response doesn't wait for the
+    embedding model and project indexing; requests that need the backends
+    wait in ``run_deferred_setup`` until the setup is done. On Linux the
+    workspace's source files are prefetched alongside (WORKSPACE_PREFETCH=0
+    turns that off). RAG_WARMUP=1 also pre-runs the suggested searches.
+    """
+    if hasattr(os, 'posix_fadvise') and os.environ.get('WORKSPACE_PREFETCH', '1') != '0':
+        threading.Thread(
+            target=prefetch_workspace, args=(workspace_path,),
+            name='web-ui-workspace-prefetch', daemon=True
+        ).start()
+    warm = os.environ.get('RAG_WARMUP', '0') != '0'
+    threading.Thread(
+        target=warm_rag_cache if warm else run_deferred_setup,
+        name='web-ui-workspace-setup', daemon=True
+    ).start()
+
+
+def warm_rag_cache():
+    """Load the RAG backends and pre-run the suggested searches (background thread).
+    
+    Runs the RAG page's quick search templates with the settings the page
+    sends for them, so those clicks are cache hits and the embedding model and
+    vector index are already resident for everything else. Each run costs a
+    full search per template, at startup and on every workspace switch, so it
+    only happens when RAG_WARMUP=1 is set.
+    """
+    try:
+        run_deferred_setup()
+        if not rag_system:
+            return
+        
+        for query, threshold, filter_type in RAG_WARMUP_QUERIES:
+            search_response_body({
+                'query': query,
+                'limit': 10,
+                'similarity_threshold': threshold,
+                'filter_language': None,
+                'filter_type': filter_type
+            })
+        rag_logger.info(f"RAG cache warmed with {len(RAG_WARMUP_QUERIES)} queries")
+    except Exception as e:
+        rag_logger.warning(f"RAG cache warm-up failed: {e}")
+
+
+def _close_llm_client(client):
+    """Close a replaced LLM client's connection pool."""
+    if client is None:
+        return
+    try:
+        run_async(client.close(), timeout=5)
+    except Exception as e:
+        web_ui_logger.warning(f"Failed to close previous LLM client: {e}")
+
+
+def _build_components(workspace_path):
+    """Construct the RAG system, LLM client and coder agent for a workspace."""
+    global rag_system, llm_client, coder_agent
+    
+    from code_dev_assistant.rag_system import CodeRAG
+    from code_dev_assistant.llm_client import CodeLLM
+    from code_dev_assistant.coder_agent import CoderAgent
+    
+    web_ui_logger.debug("Heavy dependencies imported successfully")
+    
+    # Create new RAG system with centralized database directory
+    # Use workspace name as subdirectory to keep databases organized
+    workspace_name = os.path.basename(workspace_path.rstrip('/'))
+    rag_db_path = os.path.join(RAG_DB_ROOT, workspace_name)
+    if not os.path.isdir(rag_db_path):
+        os.makedirs(rag_db_path, exist_ok=True)
+    
+    web_ui_logger.debug(f"Initializing RAG system with database path: {rag_db_path}")
+    rag_system = CodeRAG(
+        rag_db_path,
+        config.rag.embedding_model if config else "sentence-transformers/all-MiniLM-L6-v2",
+        semantic_cache_size=config.rag.semantic_cache_size if config else 0,
+        semantic_cache_threshold=config.rag.semantic_cache_threshold if config else 0.9
+    )
+    
+    llm_base_url = config.llm.base_url if config else "http://localhost:11434"
+    llm_model = config.llm.model if config else "codellama:7b-instruct"
+    if llm_client is not None and (llm_client.base_url, llm_client.model) == (llm_base_url, llm_model):
+        # The client doesn't depend on the workspace; keep its warm connections
+        web_ui_logger.debug("Reusing LLM client for %s", llm_base_url)
+    else:
+        web_ui_logger.debug("Initializing LLM client with URL: %s", llm_base_url)
+        previous_llm_client = llm_client
+        llm_client = CodeLLM(llm_base_url, llm_model)
+        # All LLM routes share the client's connection pool; release the old one's
+        _close_llm_client(previous_llm_client)
+    run_async(llm_client.start_session(), timeout=5)
+    
+    # Initialize the coder agent
+    web_ui_logger.debug("Initializing coder agent")
+    coder_agent = CoderAgent(
+        llm_client=llm_client,
+        rag_system=rag_system,
+        code_analyzer=code_analyzer,
+        git_tools=git_tools
+    )
+
+
+def reinitialize_components(workspace_path, eager=True):
+    """Reinitialize all components with a new workspace path.
+    
+    With ``eager=False`` only the git tools and code analyzer are built; the
+    RAG system, LLM client and coder agent are constructed by the first request
+    that needs them, and loading the embedding model and indexing the project
+    wait for the first RAG/chat/agent request (see ``ensure_workspace_backends``).
+    """
     global config, git_tools, code_analyzer, rag_system, llm_client, coder_agent
+    global _pending_workspace_setup, _pending_component_build
+    global _workspace_generation, _backend_ready, _backend_setup_started
     
     web_ui_logger.info(f"Starting component reinitialization for workspace: {workspace_path}")
     
     try:
-        # Lazy import heavy dependencies
         from code_dev_assistant.git_tools import GitTools
         from code_dev_assistant.code_analyzer import CodeAnalyzer
-        from code_dev_assistant.rag_system import CodeRAG
-        from code_dev_assistant.llm_client import CodeLLM
-        from code_dev_assistant.coder_agent import CoderAgent
-        
-        web_ui_logger.debug("Heavy dependencies imported successfully")
         
         # Update or create config
         if not config:
@@ -1823,6 +2702,9 @@ def reinitialize_components(workspace_path):
         
         config.workspace_path = workspace_path
         web_ui_logger.debug(f"Configuration updated with workspace path: {workspace_path}")
+        invalidate_config_json()
+        clear_rag_caches()
+        git_branches_cache.clear()
         
         # Reinitialize components
         web_ui_logger.debug("Initializing Git tools")
@@ -1831,45 +2713,22 @@ def reinitialize_components(workspace_path):
         web_ui_logger.debug("Initializing code analyzer")
         code_analyzer = CodeAnalyzer()
         
-        # Create new RAG system with centralized database directory
-        # Use workspace name as subdirectory to keep databases organized
-        workspace_name = os.path.basename(workspace_path.rstrip('/'))
-        rag_db_path = os.path.join(os.path.dirname(__file__), '..', 'databases', 'rag', workspace_name)
-        os.makedirs(rag_db_path, exist_ok=True)
-        
-        web_ui_logger.debug(f"Initializing RAG system with database path: {rag_db_path}")
-        rag_system = CodeRAG(rag_db_path, config.rag.embedding_model if config else "sentence-transformers/all-MiniLM-L6-v2")
-        
-        web_ui_logger.debug(f"Initializing LLM client with URL: {config.llm.base_url if config else 'http://localhost:11434'}")
-        llm_client = CodeLLM(
-            config.llm.base_url if config else "http://localhost:11434",
-            config.llm.model if config else "codellama:7b-instruct"
-        )
-        
-        # Initialize RAG system
-        try:
-            web_ui_logger.debug("Initializing RAG system database")
-            run_async(rag_system.initialize())
-            web_ui_logger.info(f"✅ RAG system initialized for workspace: {workspace_path}")
-        except Exception as e:
-            web_ui_logger.warning(f"RAG system initialization failed: {e}")
-        
-        # Initialize the coder agent
-        web_ui_logger.debug("Initializing coder agent")
-        coder_agent = CoderAgent(
-            llm_client=llm_client,
-            rag_system=rag_system,
-            code_analyzer=code_analyzer,
-            git_tools=git_tools
-        )
-        
-        # Initialize project context
-        try:
-            web_ui_logger.debug("Initializing project context")
-            run_async(coder_agent.initialize_project_context(workspace_path))
-            web_ui_logger.info(f"✅ Coder agent initialized for workspace: {workspace_path}")
-        except Exception as e:
-            web_ui_logger.warning(f"Coder agent initialization failed: {e}")
+        with _components_lock:
+            # Supersede any setup still running for a previous selection
+            _workspace_generation += 1
+            _backend_ready = threading.Event()
+            _backend_setup_started = False
+            if eager:
+                _pending_component_build = _pending_workspace_setup = None
+                _build_components(workspace_path)
+            else:
+                # The LLM client is kept for _build_components to reuse
+                rag_system = coder_agent = None
+                _pending_component_build = _pending_workspace_setup = workspace_path
+        if eager:
+            _setup_workspace_backends(workspace_path, rag_system, coder_agent)
+        else:
+            web_ui_logger.info(f"Deferring RAG/LLM/agent setup for {workspace_path} until first use")
         
         web_ui_logger.info(f"Component reinitialization completed successfully for: {workspace_path}")
         return True
@@ -1878,6 +2737,20 @@ def reinitialize_components(workspace_path):
         web_ui_logger.exception(f"Failed to reinitialize components: {e}")
         return False
 
+
+def serve_production(host, port):
+    """Serve the app with waitress, or the threaded Werkzeug server if it is missing.
+    
+    For gunicorn (including gevent workers) use the ``web_ui.wsgi:app`` entry point.
+    """
+    try:
+        from waitress import serve
+        serve(app, host=host, port=port, threads=int(os.environ.get('WEB_UI_THREADS', 16)))
+    except ImportError:
+        web_ui_logger.warning("waitress not installed; falling back to the threaded Werkzeug server")
+        app.run(debug=False, host=host, port=port, threaded=True)
+
+
 if __name__ == '__main__':
     # Initialize components
     init_success = init_components()
@@ -1886,5 +2759,11 @@ if __name__ == '__main__':
     else:
         print("⚠️ Some components failed to initialize - check configuration")
     
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    host = os.environ.get('HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', 5000))
+    
+    if os.environ.get('FLASK_DEV'):
+        # Werkzeug development server with debugger and reloader
+        app.run(debug=True, host=host, port=port)
+    else:
+        serve_production(host, port)
\ No newline at end of file
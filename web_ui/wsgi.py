@@ -0,0 +1,24 @@
+"""
+WSGI entry point for running the web UI under an external server.
+
+Example (from the project root):
+
+    gunicorn -k gevent -w 2 --worker-connections 500 web_ui.wsgi:app
+
+Gunicorn's gevent worker monkey-patches the process itself. For other servers
+that expect the application to do it, set WEB_UI_GEVENT=1. The patching has
+to happen before Flask, httpx and asyncio are imported, which is why it lives
+here rather than in app.py.
+"""
+import os
+
+if os.environ.get('WEB_UI_GEVENT'):
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        pass
+
+from web_ui.app import app, init_components
+
+init_components()
@@ -48,7 +48,7 @@ def check_dependencies():
     """Check if required dependencies are available."""
     print("🔍 Checking dependencies...")
     
-    required_packages = ['flask']
+    required_packages = ['flask', 'orjson']
     missing_packages = []
     
     for package in required_packages:
@@ -115,7 +115,10 @@ def start_flask_app(web_ui_dir, host='127.0.0.1', port=5000, debug=False):
         signal.signal(signal.SIGINT, signal_handler)
         
         # Start the Flask application
-        app.app.run(host=host, port=port, debug=debug, use_reloader=False)
+        if debug:
+            app.app.run(host=host, port=port, debug=debug, use_reloader=False)
+        else:
+            app.serve_production(host, port)
         
     except ImportError as e:
         print(f"❌ Failed to import Flask app: {e}")
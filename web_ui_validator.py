@@ -19,45 +19,190 @@ Options:
 import os
 import sys
 import argparse
+import contextvars
+import importlib.util
+import io
 import json
+import re
+import subprocess
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # The validator still has to run before dependencies are installed
+    orjson = None
+
+BASE_PATH = Path(__file__).parent
+TEMPLATES_PATH = os.path.join(BASE_PATH, 'web_ui', 'templates')
+ENV_FILE = os.path.join(BASE_PATH, '.env')
+PYPROJECT_FILE = os.path.join(BASE_PATH, 'pyproject.toml')
+SRC_PATH = os.path.join(BASE_PATH, 'src')
+
+REQUIRED_STRUCTURE = {
+    'directories': [
+        'src/code_dev_assistant',
+        'web_ui',
+        'web_ui/templates'
+    ],
+    'files': {
+        'src/code_dev_assistant/__init__.py': 'Package init',
+        'src/code_dev_assistant/config.py': 'Configuration module',
+        'src/code_dev_assistant/git_tools.py': 'Git tools',
+        'src/code_dev_assistant/rag_system.py': 'RAG system',
+        'src/code_dev_assistant/llm_client.py': 'LLM client',
+        'web_ui/app.py': 'Flask application',
+        'web_ui/templates/base.html': 'Base template',
+        'web_ui/templates/index.html': 'Dashboard template',
+        'web_ui/templates/git.html': 'Git interface template',
+        'web_ui/templates/rag.html': 'RAG search template',
+        'web_ui/templates/llm.html': 'AI tools template',
+        'web_ui/templates/chat.html': 'Chat interface template',
+        'web_ui/templates/settings.html': 'Settings template',
+        '.env': 'Environment configuration',
+        'pyproject.toml': 'Project configuration'
+    }
+}
+
+TEMPLATE_REQUIREMENTS = {
+    'base.html': [b'<!DOCTYPE html>', b'<html', b'</html>'],
+    'index.html': [b'{% extends "base.html" %}', b'{% block content %}'],
+    'git.html': [b'{% extends "base.html" %}', b'git'],
+    'rag.html': [b'{% extends "base.html" %}', b'rag'],
+    'llm.html': [b'{% extends "base.html" %}', b'llm'],
+    'chat.html': [b'{% extends "base.html" %}', b'chat'],
+    'settings.html': [b'{% extends "base.html" %}', b'settings']
+}
+
+# Output buffer of the validator running in the current thread, if any
+_captured_output = contextvars.ContextVar('captured_output', default=None)
+
+class _ValidatorStdout:
+    """Stand-in for sys.stdout that routes prints to the running validator's buffer."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return (_captured_output.get() or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+
+def _run_captured(validator, *args):
+    """Run a validator, returning its result along with everything it printed."""
+    buffer = io.StringIO()
+    _captured_output.set(buffer)
+    return validator(*args), buffer.getvalue()
+
+def run_validators(validators):
+    """Run independent validators concurrently and print their output in order.
+    
+    The checks mostly wait on stat/open/read and import lookups, so threads
+    overlap them; each validator's output is buffered and written out in the
+    order the validators were given, in a single write.
+    """
+    stdout = sys.stdout
+    sys.stdout = _ValidatorStdout(stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=len(validators)) as executor:
+            futures = {
+                name: executor.submit(_run_captured, *validator)
+                for name, validator in validators.items()
+            }
+            results = {}
+            outputs = []
+            for name, future in futures.items():
+                results[name], output = future.result()
+                outputs.append(output)
+    finally:
+        sys.stdout = stdout
+    stdout.write(''.join(outputs))
+    stdout.flush()
+    return results
+
+# Directory listings shared by all validators for the run, keyed by path
+_directory_listings = {}
+
+def directory_listing(path):
+    """Map a directory's entry names to their DirEntry, scanning it at most once per run.
+    
+    DirEntry caches its type and stat result, so validators that look at the
+    same files share those as well. Unreadable directories list as empty.
+    """
+    listing = _directory_listings.get(path)
+    if listing is None:
+        try:
+            with os.scandir(path) as it:
+                listing = {entry.name: entry for entry in it}
+        except OSError:
+            listing = {}
+        _directory_listings[path] = listing
+    return listing
+
+def scan_parent_directories(base_path, relative_paths):
+    """Map each relative path to its DirEntry, scanning every parent directory once.
+    
+    Paths that don't exist are left out of the result.
+    """
+    entries = {}
+    for relative_path in relative_paths:
+        parent, _, name = relative_path.rpartition('/')
+        directory = os.path.join(base_path, parent) if parent else os.fspath(base_path)
+        entry = directory_listing(directory).get(name)
+        if entry is not None:
+            entries[relative_path] = entry
+    return entries
+
+def is_listed_file(path):
+    """Check for a regular file through the shared directory listings."""
+    entry = directory_listing(os.path.dirname(path)).get(os.path.basename(path))
+    return entry is not None and entry.is_file()
+
+_module_availability = {}
+
+def module_available(name):
+    """Check whether a module can be found without importing (executing) it."""
+    if name not in _module_availability:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        _module_availability[name] = spec is not None
+    return _module_availability[name]
+
+def read_file_bytes(path):
+    """Read a whole file with a single unbuffered read."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+def write_file_bytes(path, data):
+    """Replace a file's contents using unbuffered writes."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 def validate_project_structure(verbose=False):
     """Validate the overall project structure."""
     print("🔍 Validating Project Structure...")
     
-    base_path = Path(__file__).parent
-    required_structure = {
-        'directories': [
-            'src/code_dev_assistant',
-            'web_ui',
-            'web_ui/templates'
-        ],
-        'files': {
-            'src/code_dev_assistant/__init__.py': 'Package init',
-            'src/code_dev_assistant/config.py': 'Configuration module',
-            'src/code_dev_assistant/git_tools.py': 'Git tools',
-            'src/code_dev_assistant/rag_system.py': 'RAG system',
-            'src/code_dev_assistant/llm_client.py': 'LLM client',
-            'web_ui/app.py': 'Flask application',
-            'web_ui/templates/base.html': 'Base template',
-            'web_ui/templates/index.html': 'Dashboard template',
-            'web_ui/templates/git.html': 'Git interface template',
-            'web_ui/templates/rag.html': 'RAG search template',
-            'web_ui/templates/llm.html': 'AI tools template',
-            'web_ui/templates/chat.html': 'Chat interface template',
-            'web_ui/templates/settings.html': 'Settings template',
-            '.env': 'Environment configuration',
-            'pyproject.toml': 'Project configuration'
-        }
-    }
-    
     all_good = True
+    entries = scan_parent_directories(
+        BASE_PATH, [*REQUIRED_STRUCTURE['directories'], *REQUIRED_STRUCTURE['files']]
+    )
     
     # Check directories
-    for directory in required_structure['directories']:
-        dir_path = base_path / directory
-        if dir_path.exists() and dir_path.is_dir():
+    for directory in REQUIRED_STRUCTURE['directories']:
+        entry = entries.get(directory)
+        if entry is not None and entry.is_dir():
             if verbose:
                 print(f"✅ Directory: {directory}")
         else:
@@ -65,10 +210,10 @@ def validate_project_structure(verbose=False):
             all_good = False
     
     # Check files
-    for file_path, description in required_structure['files'].items():
-        full_path = base_path / file_path
-        if full_path.exists() and full_path.is_file():
-            size = full_path.stat().st_size
+    for file_path, description in REQUIRED_STRUCTURE['files'].items():
+        entry = entries.get(file_path)
+        if entry is not None and entry.is_file():
+            size = entry.stat().st_size
             if verbose:
                 print(f"✅ {file_path:<35} ({size:,} bytes) - {description}")
             elif size < 50:  # Warn about very small files
@@ -85,6 +230,7 @@ def validate_dependencies(verbose=False):
     
     core_dependencies = {
         'flask': 'Web framework',
+        'orjson': 'Fast JSON serialization',
         'pathlib': 'Path handling (built-in)',
         'json': 'JSON processing (built-in)',
         'os': 'OS interface (built-in)',
@@ -94,52 +240,77 @@ def validate_dependencies(verbose=False):
     optional_dependencies = {
         'gitpython': 'Git operations',
         'langchain': 'LLM framework',
-        'sentence_transformers': 'Embeddings'
+        'sentence_transformers': 'Embeddings',
+        'markupsafe._speedups': 'C-accelerated template escaping',
+        'brotli': 'Brotli response compression'
     }
     
     all_good = True
     
     # Check core dependencies
     for package, description in core_dependencies.items():
-        try:
-            __import__(package)
+        if module_available(package):
             if verbose:
                 print(f"✅ {package:<20} - {description}")
-        except ImportError:
+        else:
             print(f"❌ {package:<20} - {description} (REQUIRED)")
             all_good = False
     
     # Check optional dependencies
     for package, description in optional_dependencies.items():
-        try:
-            __import__(package)
+        if module_available(package):
             if verbose:
                 print(f"✅ {package:<20} - {description}")
-        except ImportError:
+        else:
             if verbose:
                 print(f"⚠️  {package:<20} - {description} (optional, limited functionality)")
     
     return all_good
 
+# Leading distribution name of a PEP 508 requirement string
+REQUIREMENT_NAME_RE = re.compile(r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+def env_variable_names(content):
+    """Names assigned in .env content, ignoring blank and comment lines."""
+    names = set()
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith(b'#'):
+            continue
+        if line.startswith(b'export '):
+            line = line[7:]
+        name, sep, _ = line.partition(b'=')
+        if sep:
+            names.add(name.strip().decode(errors='replace'))
+    return names
+
+def project_dependency_names(content):
+    """Normalized distribution names from pyproject.toml's [project] dependencies."""
+    dependencies = tomllib.loads(content.decode()).get('project', {}).get('dependencies', [])
+    names = set()
+    for requirement in dependencies:
+        match = REQUIREMENT_NAME_RE.match(requirement)
+        if match:
+            names.add(re.sub(r'[-_.]+', '-', match.group(1)).lower())
+    return names
+
 def validate_configuration(verbose=False):
     """Validate configuration files and environment."""
     print("\n🔍 Validating Configuration...")
     
-    base_path = Path(__file__).parent
     all_good = True
     
     # Check .env file
-    env_file = base_path / '.env'
-    if env_file.exists():
+    if is_listed_file(ENV_FILE):
         if verbose:
             print("✅ .env file exists")
         
         # Check key environment variables
-        env_content = env_file.read_text()
+        env_vars = env_variable_names(read_file_bytes(ENV_FILE))
         required_vars = ['WORKSPACE_PATH', 'LLM_BASE_URL', 'LLM_MODEL']
         
         for var in required_vars:
-            if var in env_content:
+            if var in env_vars:
                 if verbose:
                     print(f"✅ Environment variable: {var}")
             else:
@@ -148,17 +319,20 @@ def validate_configuration(verbose=False):
         print("⚠️  .env file not found (will use defaults)")
     
     # Check pyproject.toml
-    pyproject_file = base_path / 'pyproject.toml'
-    if pyproject_file.exists():
+    if is_listed_file(PYPROJECT_FILE):
         if verbose:
             print("✅ pyproject.toml exists")
         
-        content = pyproject_file.read_text()
-        if 'flask' in content:
-            if verbose:
-                print("✅ Flask listed in dependencies")
+        try:
+            dependencies = project_dependency_names(read_file_bytes(PYPROJECT_FILE))
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+            print(f"⚠️  pyproject.toml could not be parsed: {e}")
         else:
-            print("⚠️  Flask not found in pyproject.toml dependencies")
+            if 'flask' in dependencies:
+                if verbose:
+                    print("✅ Flask listed in dependencies")
+            else:
+                print("⚠️  Flask not found in pyproject.toml dependencies")
     
     return all_good
 
@@ -166,33 +340,21 @@ def validate_templates(verbose=False):
     """Validate HTML template files."""
     print("\n🔍 Validating Templates...")
     
-    base_path = Path(__file__).parent / 'web_ui' / 'templates'
-    template_requirements = {
-        'base.html': ['<!DOCTYPE html>', '<html', '</html>'],
-        'index.html': ['{% extends "base.html" %}', '{% block content %}'],
-        'git.html': ['{% extends "base.html" %}', 'git'],
-        'rag.html': ['{% extends "base.html" %}', 'rag'],
-        'llm.html': ['{% extends "base.html" %}', 'llm'],
-        'chat.html': ['{% extends "base.html" %}', 'chat'],
-        'settings.html': ['{% extends "base.html" %}', 'settings']
-    }
-    
     all_good = True
     
-    for template, required_content in template_requirements.items():
-        template_path = base_path / template
-        
-        if not template_path.exists():
+    for template, required_content in TEMPLATE_REQUIREMENTS.items():
+        try:
+            content = read_file_bytes(os.path.join(TEMPLATES_PATH, template))
+        except FileNotFoundError:
             print(f"❌ Missing template: {template}")
             all_good = False
             continue
         
-        content = template_path.read_text()
         missing_content = []
         
         for requirement in required_content:
             if requirement not in content:
-                missing_content.append(requirement)
+                missing_content.append(requirement.decode())
         
         if missing_content:
             print(f"⚠️  {template}: missing {', '.join(missing_content)}")
@@ -201,29 +363,84 @@ def validate_templates(verbose=False):
     
     return all_good
 
-def test_import_capability():
-    """Test if the web UI components can be imported."""
-    print("\n🔍 Testing Import Capability...")
+# Imports each module named on the command line (after the source path) and
+# prints one JSON line per module with the error message, or null on success.
+# __import__ rather than importlib.import_module, so -X importtime times it
+IMPORT_PROBE = """\
+import json, sys
+sys.path.insert(0, sys.argv[1])
+for name in sys.argv[2:]:
+    try:
+        __import__(name)
+        error = None
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    print(json.dumps([name, error]), flush=True)
+"""
+IMPORT_PROBE_TIMEOUT = 60
+
+def parse_import_times(stderr):
+    """Cumulative import time in microseconds per module from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line.split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue
+        name = parts[2].strip()
+        times[name] = max(cumulative, times.get(name, 0))
+    return times
+
+def test_import_capability(verbose=False):
+    """Test if the web UI components can be imported.
     
-    # Add src to path
-    src_path = Path(__file__).parent / 'src'
-    if str(src_path) not in sys.path:
-        sys.path.insert(0, str(src_path))
+    The imports run in a child interpreter so the modules they pull in don't
+    stay loaded in the validator; ``-X importtime`` reports what each one cost.
+    """
+    print("\n🔍 Testing Import Capability...")
     
     import_tests = [
         ('code_dev_assistant.config', 'Configuration module'),
         ('flask', 'Flask framework')
     ]
     
+    try:
+        probe = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORT_PROBE, SRC_PATH,
+             *(module for module, _ in import_tests)],
+            capture_output=True, text=True, timeout=IMPORT_PROBE_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"❌ Import test could not run: {e}")
+        return False
+    
+    errors = {}
+    for line in probe.stdout.splitlines():
+        try:
+            module, error = json.loads(line)
+        except ValueError:
+            continue
+        errors[module] = error
+    import_times = parse_import_times(probe.stderr) if verbose else {}
+    
     all_good = True
     
     for module, description in import_tests:
-        try:
-            __import__(module)
-            print(f"✅ Import test: {module} - {description}")
-        except ImportError as e:
-            print(f"❌ Import test failed: {module} - {e}")
+        if module not in errors:
+            print(f"❌ Import test failed: {module} - import probe exited with code {probe.returncode}")
             all_good = False
+        elif errors[module] is not None:
+            print(f"❌ Import test failed: {module} - {errors[module]}")
+            all_good = False
+        elif module in import_times:
+            print(f"✅ Import test: {module} - {description} ({import_times[module] / 1000:.1f} ms)")
+        else:
+            print(f"✅ Import test: {module} - {description}")
     
     return all_good
 
@@ -231,8 +448,12 @@ def generate_status_report(results, base_path):
     """Generate a status report."""
     print("\n📋 Generating Status Report...")
     
+    # The base directory is already listed by the structure check
+    script_entry = directory_listing(os.fspath(BASE_PATH)).get(os.path.basename(__file__))
+    script_stat = script_entry.stat() if script_entry is not None else os.stat(__file__)
+    
     report = {
-        'timestamp': str(Path(__file__).stat().st_mtime),
+        'timestamp': str(script_stat.st_mtime),
         'validation_results': results,
         'recommendations': []
     }
@@ -252,8 +473,11 @@ def generate_status_report(results, base_path):
     
     # Write report
     report_file = base_path / 'web_ui_validation_report.json'
-    with open(report_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    if orjson is not None:
+        data = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(report, indent=2).encode()
+    write_file_bytes(report_file, data)
     
     print(f"📄 Report saved to: {report_file}")
 
@@ -274,19 +498,17 @@ def main():
     print("Code Development Assistant Web UI Validator")
     print("=" * 45)
     
-    base_path = Path(__file__).parent
-    
     # Run all validation tests
-    results = {
-        'structure': validate_project_structure(args.verbose),
-        'dependencies': validate_dependencies(args.verbose),
-        'configuration': validate_configuration(args.verbose),
-        'templates': validate_templates(args.verbose),
-        'imports': test_import_capability()
-    }
+    results = run_validators({
+        'structure': (validate_project_structure, args.verbose),
+        'dependencies': (validate_dependencies, args.verbose),
+        'configuration': (validate_configuration, args.verbose),
+        'templates': (validate_templates, args.verbose),
+        'imports': (test_import_capability, args.verbose)
+    })
     
     # Generate status report
-    generate_status_report(results, base_path)
+    generate_status_report(results, BASE_PATH)
     
     # Summary
     print("\n" + "=" * 45)